@@ -0,0 +1,165 @@
+"""Local JSON HTTP API for the TMF conversion and strategy calculations.
+
+Serves the numbers portfolio.py shows (contracts needed, premium cost, strategy
+summaries, sell-call income and projected returns) to other tools:
+
+    python api.py --port 8502
+    python api.py --snapshot snapshots/2025-07-15    # stub data, no network access
+
+Endpoints:
+
+    GET  /health
+    GET  /quotes?tickers=TMF,TLT,EDV
+    GET  /cache                       cache and coalescing counters
+    POST /convert                     one portfolio, in batch.py's JSON format
+
+Every request thread shares market_data's price/chain caches and its coalescing,
+so concurrent requests for the same chain trigger one upstream fetch. Identical
+/convert bodies arriving together are computed once and share the response.
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import batch
+import greeks
+import market_data
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+MAX_BODY_BYTES = 1 << 20
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(df):
+    """DataFrame rows as JSON-ready dicts (NaN becomes null)"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def convert(portfolio, rate=greeks.DEFAULT_RISK_FREE_RATE):
+    """Every table batch.py writes, for a single portfolio"""
+    if not isinstance(portfolio, dict):
+        raise ApiError(400, "Request body must be a JSON object")
+    # Validated before fetching: fetch_market_data reads every holding's ticker
+    try:
+        portfolio = batch.with_defaults(portfolio, portfolio.get('account', ''))
+    except ValueError as exc:
+        raise ApiError(400, f"Invalid portfolio: {exc}")
+    market = batch.fetch_market_data([portfolio], rate=rate)
+    if 'TMF' not in market['spots']:
+        raise ApiError(503, "Failed to fetch TMF price")
+    try:
+        tables = batch.evaluate_portfolio(portfolio, market)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ApiError(400, f"Invalid portfolio: {exc}")
+    response = {'spots': market['spots'], 'missing_chains': market['missing_chains']}
+    response.update({name: _records(df.drop(columns='account')) for name, df in tables.items()})
+    return response
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "TMFConversionAPI/1.0"
+    risk_free_rate = greeks.DEFAULT_RISK_FREE_RATE
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        try:
+            self._send(200, route())
+        except ApiError as exc:
+            self._send(exc.status, {'error': str(exc)})
+        except Exception as exc:
+            self._send(500, {'error': f"{type(exc).__name__}: {exc}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._handle(lambda: {'status': 'ok', 'provider': market_data.get_provider().name})
+        elif url.path == '/quotes':
+            tickers = [t.strip().upper() for t in ','.join(parse_qs(url.query).get('tickers', [])).split(',') if t.strip()]
+            self._handle(lambda: market_data.get_spot_prices(tickers))
+        elif url.path == '/cache':
+            self._handle(lambda: dict(market_data.cache_stats(), coalesced=market_data.coalesced_requests()))
+        else:
+            self._send(404, {'error': f"Unknown path: {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/convert':
+            self._send(404, {'error': f"Unknown path: {url.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        # A negative length would make rfile.read() wait for the client to close the connection
+        if length < 0:
+            self._send(400, {'error': "Invalid Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send(413, {'error': "Request body too large"})
+            return
+        body = self.rfile.read(length)
+        self._handle(lambda: market_data.coalesce(('convert', self.risk_free_rate, body), lambda: self._convert(body)))
+
+    def _convert(self, body):
+        try:
+            portfolio = json.loads(body or b'{}')
+        except ValueError as exc:
+            raise ApiError(400, f"Invalid JSON: {exc}")
+        return convert(portfolio, rate=self.risk_free_rate)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, rate=greeks.DEFAULT_RISK_FREE_RATE):
+    """A threaded server for the API; one thread per connection, all sharing the market data caches"""
+    handler = type('ConfiguredApiHandler', (ApiHandler,), {'risk_free_rate': rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the TMF conversion calculations as JSON")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--snapshot', help="Serve market data from this snapshot directory instead of fetching it")
+    parser.add_argument('--risk-free-rate', type=float, default=greeks.DEFAULT_RISK_FREE_RATE * 100, help="Risk-free rate for deltas (%%)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        market_data.set_replay_snapshot(args.snapshot)
+    server = make_server(args.host, args.port, rate=args.risk_free_rate / 100)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
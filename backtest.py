@@ -0,0 +1,138 @@
+"""Historical backtest of the TLT/EDV covered-call strategies.
+
+Each parameter set is one capital split (shares and long calls for TLT and EDV)
+plus the strike offsets its monthly calls are sold at. The split is replayed
+over daily closes, rolled every month:
+
+- shares earn the price change plus their dividend yield, accrued daily,
+- long calls are bought at a fixed moneyness and time to expiry, then marked to
+  model at the next roll and rebought, so they always keep the same profile,
+- every contract held (100 shares or one long call) sells one call at the
+  offset strike; the premium is kept and assignment gives back anything the
+  month's move took above the strike.
+
+Option prices come from a pricing model (Black-Scholes on trailing realized
+volatility by default) since historical chains are not available. The allocation
+is rebalanced to its target weights at every roll.
+
+All roll periods are computed at once as arrays, and parameter sets are
+broadcast against them, so each chunk of parameter sets is a few NumPy
+operations. Large sweeps spread the chunks over a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import greeks
+
+ETFS = ['TLT', 'EDV']
+TRADING_DAYS = 252
+ROLL_TRADING_DAYS = 21
+VOL_WINDOW = 63
+DEFAULT_LONG_MONEYNESS = 0.85
+DEFAULT_LONG_DAYS = 365
+CHUNK_PARAMS = 64
+# Above this many parameter sets the chunks are spread over a process pool
+PARALLEL_PARAM_THRESHOLD = 256
+PARAM_COLUMNS = [f'{etf} {kind} (%)' for etf in ETFS for kind in ('Shares', 'Calls', 'Offset')]
+
+
+def realized_vols(history, window=VOL_WINDOW):
+    """Trailing annualized volatility of each column; the warm-up is backfilled"""
+    returns = np.log(history).diff()
+    return (returns.rolling(window, min_periods=10).std() * np.sqrt(TRADING_DAYS)).bfill()
+
+
+def roll_dates(history, roll_days=ROLL_TRADING_DAYS):
+    """Every roll_days-th trading day of history, starting with the first"""
+    return history.index[::roll_days]
+
+
+def _period_inputs(history, vols, dates):
+    """Per-roll-period start/end closes, volatility and year fraction of each ETF"""
+    start, end = dates[:-1], dates[1:]
+    years = np.asarray((end - start).days, dtype=float) / 365.0
+    return {
+        etf: (history.loc[start, etf].to_numpy(), history.loc[end, etf].to_numpy(), vols.loc[start, etf].to_numpy())
+        for etf in ETFS
+    }, years
+
+
+def _chunk_returns(params, inputs, years, long_moneyness, long_days, dividend_yields, rate, pricing_model):
+    """Period returns of each parameter set, shape (params, periods)"""
+    total = np.zeros((len(params), len(years)))
+    for etf in ETFS:
+        s0, s1, vol = inputs[etf]
+        shares_w = params[f'{etf} Shares (%)'].to_numpy()[:, None] / 100
+        calls_w = params[f'{etf} Calls (%)'].to_numpy()[:, None] / 100
+        offset = params[f'{etf} Offset (%)'].to_numpy()[:, None] / 100
+        dividend_yield = dividend_yields.get(etf, 0.0) / 100
+
+        share_ret = (s1 - s0) / s0 + dividend_yield * years
+
+        long_strike = s0 * long_moneyness.get(etf, DEFAULT_LONG_MONEYNESS)
+        long_years = long_days.get(etf, DEFAULT_LONG_DAYS) / 365.0
+        long_cost = pricing_model(s0, long_strike, long_years, vol, rate, dividend_yield)
+        long_value = pricing_model(s1, long_strike, np.maximum(long_years - years, 1 / 365.0), vol, rate, dividend_yield)
+        long_ret = long_value / long_cost - 1
+
+        # One short call per 100 shares and per long call, per dollar of capital
+        short_per_capital = shares_w / s0 + calls_w / long_cost
+        short_strike = s0 * (1 + np.nan_to_num(offset))
+        premium = pricing_model(s0, short_strike, years, vol, rate, dividend_yield)
+        assigned = np.maximum(s1 - short_strike, 0)
+        short_pnl = np.where(np.isnan(offset), 0.0, premium - assigned)
+
+        total += shares_w * share_ret + calls_w * long_ret + short_per_capital * short_pnl
+    # Losing more than the capital ends the strategy
+    return np.maximum(total, -1.0)
+
+
+def run_backtests(history, params, long_moneyness=None, long_days=None, dividend_yields=None,
+                  rate=greeks.DEFAULT_RISK_FREE_RATE, pricing_model=greeks.call_price,
+                  roll_days=ROLL_TRADING_DAYS, workers=None):
+    """Equity curve of every parameter set (growth of $1), indexed by roll date.
+
+    history holds daily closes with TLT and EDV columns. params has one row per
+    parameter set with a Strategy name and PARAM_COLUMNS; a NaN offset sells no
+    calls on that ETF. long_moneyness (strike / spot), long_days and dividend_yields
+    (percent) map ETF -> value. pricing_model(spot, strike, years, vol, rate,
+    dividend_yield) must broadcast like greeks.call_price.
+    """
+    history = history[ETFS].dropna().sort_index()
+    dates = roll_dates(history, roll_days)
+    if len(dates) < 2:
+        return pd.DataFrame(columns=list(params['Strategy']), dtype=float)
+    inputs, years = _period_inputs(history, realized_vols(history), dates)
+    extra = (long_moneyness or {}, long_days or {}, dividend_yields or {}, rate, pricing_model)
+
+    chunks = [params.iloc[i:i + CHUNK_PARAMS] for i in range(0, len(params), CHUNK_PARAMS)]
+    args = [(chunk, inputs, years) + extra for chunk in chunks]
+    if len(params) > PARALLEL_PARAM_THRESHOLD and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers or min(len(chunks), os.cpu_count() or 1)) as pool:
+            returns = list(pool.map(_chunk_returns, *zip(*args)))
+    else:
+        returns = [_chunk_returns(*chunk_args) for chunk_args in args]
+
+    period_returns = np.concatenate(returns)
+    equity = np.concatenate([np.ones((len(params), 1)), np.cumprod(1 + period_returns, axis=1)], axis=1)
+    return pd.DataFrame(equity.T, index=dates, columns=list(params['Strategy']))
+
+
+def summarize_backtests(equity):
+    """Total and annualized return, volatility, Sharpe ratio (no risk-free rate) and max drawdown per column"""
+    years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1 / 365.25)
+    periods_per_year = (len(equity) - 1) / years
+    returns = equity.pct_change().iloc[1:]
+    volatility = returns.std() * np.sqrt(periods_per_year)
+    final = equity.iloc[-1].clip(lower=0)
+    return pd.DataFrame({
+        'Strategy': equity.columns,
+        'Total Return (%)': (final - 1).to_numpy() * 100,
+        'Annualized Return (%)': (final ** (1 / years) - 1).to_numpy() * 100,
+        'Annualized Volatility (%)': volatility.to_numpy() * 100,
+        'Sharpe Ratio': (returns.mean() * periods_per_year / volatility).to_numpy(),
+        'Max Drawdown (%)': ((equity / equity.cummax()).min() - 1).to_numpy() * 100,
+    })
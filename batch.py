@@ -0,0 +1,324 @@
+"""Headless batch mode: run the TMF conversion for many portfolios from a file.
+
+Market data is fetched (or replayed from a snapshot) once per ticker, then every
+portfolio is evaluated with tmf_core across a process pool:
+
+    python batch.py portfolios.json out/ --format parquet
+    python batch.py portfolios.csv out/ --snapshot snapshots/2025-07-15
+
+JSON input is a list of portfolios; any field left out takes the apps' default
+(see DEFAULT_PORTFOLIO):
+
+    [{"account": "A-1", "tmf_shares": 7270,
+      "holdings": [{"ticker": "TLT", "value": 0, "multiple": 2.2}],
+      "strategies": {"Strategy 1": {"TLT": [0, 50], "EDV": [50, 0]}},
+      "tlt_offset": 5.0, "dividend_yields": {"TLT": 3.9, "EDV": 4.9}}]
+
+CSV input has one row per (account, strategy) with the columns account,
+tmf_shares, strategy, tlt_shares_pct, tlt_calls_pct, edv_shares_pct,
+edv_calls_pct and, optionally, holdings ("TLT:0:2.2;EDV:0:1.5", ticker:value:multiple)
+and the scalar fields of DEFAULT_PORTFOLIO (tlt_yield / edv_yield for the yields).
+
+Long calls are the chain strikes nearest long_offset (TLT) and long_offset x
+long_multiple (EDV) from spot, and sold calls the strikes nearest tlt_offset and
+tlt_offset x strike_multiple, all on the first expiry at least 30 days out, as in
+the apps. The output directory gets exposures, strategies, sell_calls and
+projections tables, each with an account column.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import greeks
+import market_data
+import tmf_core
+
+DEFAULT_PORTFOLIO = {
+    'tmf_shares': 7270,
+    'holdings': [
+        {'ticker': 'TLT', 'value': 0.0, 'multiple': 2.2},
+        {'ticker': 'EDV', 'value': 0.0, 'multiple': 1.5},
+    ],
+    'strategies': {
+        'Strategy 1': {'TLT': (0.0, 50.0), 'EDV': (50.0, 0.0)},
+        'Strategy 2': {'TLT': (50.0, 0.0), 'EDV': (0.0, 50.0)},
+    },
+    'long_offset': -10.0,
+    'long_multiple': 1.3,
+    'tlt_offset': 5.0,
+    'strike_multiple': 1.3,
+    'dividend_yields': {'TLT': 3.9, 'EDV': 4.9},
+    'upside_pct': 10.0,
+    'months': 12,
+}
+SCALAR_FIELDS = ['tmf_shares', 'long_offset', 'long_multiple', 'tlt_offset', 'strike_multiple', 'upside_pct', 'months']
+OFFSET_LIMIT = 50.0
+LONG_OFFSET_LIMIT = 75.0
+TABLES = ['exposures', 'strategies', 'sell_calls', 'projections']
+CHUNK_PORTFOLIOS = 64
+
+# Market data each worker process evaluates against, set once by _init_worker
+_market = None
+
+
+def _parse_holdings(text):
+    holdings = []
+    for item in str(text).split(';'):
+        if item.strip():
+            ticker, value, multiple = item.split(':')
+            holdings.append({'ticker': ticker.strip().upper(), 'value': float(value), 'multiple': float(multiple)})
+    return holdings
+
+
+def _portfolios_from_csv(df):
+    portfolios = []
+    for account, rows in df.groupby('account', sort=False):
+        first = rows.iloc[0]
+        portfolio = {'account': str(account)}
+        for field in SCALAR_FIELDS:
+            if field in rows.columns and pd.notna(first[field]):
+                portfolio[field] = float(first[field])
+        if 'holdings' in rows.columns and pd.notna(first['holdings']):
+            portfolio['holdings'] = _parse_holdings(first['holdings'])
+        # Empty yield cells keep the default, like the scalar fields
+        dividend_yields = {
+            etf: float(first[f'{etf.lower()}_yield'])
+            for etf in tmf_core.STRATEGY_ETFS if f'{etf.lower()}_yield' in rows.columns and pd.notna(first[f'{etf.lower()}_yield'])
+        }
+        if dividend_yields:
+            portfolio['dividend_yields'] = dividend_yields
+        if 'strategy' in rows.columns:
+            portfolio['strategies'] = {
+                str(row['strategy']): {
+                    etf: (float(row[f'{etf.lower()}_shares_pct']), float(row[f'{etf.lower()}_calls_pct']))
+                    for etf in tmf_core.STRATEGY_ETFS
+                }
+                for _, row in rows.iterrows()
+            }
+        portfolios.append(portfolio)
+    return portfolios
+
+
+def _check_number(field, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+
+
+def with_defaults(portfolio, account):
+    """portfolio filled in with DEFAULT_PORTFOLIO; raises ValueError for a missing or non-numeric value.
+
+    dividend_yields is merged ticker by ticker over the defaults, and an ETF a strategy
+    leaves out gets no allocation (0% shares, 0% calls).
+    """
+    filled = {**DEFAULT_PORTFOLIO, **portfolio, 'account': str(account)}
+    holdings = filled['holdings']
+    if not isinstance(holdings, list) or not all(isinstance(holding, dict) and isinstance(holding.get('ticker'), str) for holding in holdings):
+        raise ValueError("holdings must be a list of objects with a ticker")
+    dividend_yields = portfolio.get('dividend_yields', {})
+    if not isinstance(dividend_yields, dict) or not isinstance(filled['strategies'], dict):
+        raise ValueError("dividend_yields and strategies must be objects")
+    filled['dividend_yields'] = {**DEFAULT_PORTFOLIO['dividend_yields'], **dividend_yields}
+    strategies = {}
+    for name, allocation in filled['strategies'].items():
+        if not isinstance(allocation, dict):
+            raise ValueError(f"strategy {name} must map ETFs to [shares %, calls %]")
+        strategies[name] = {}
+        for etf in tmf_core.STRATEGY_ETFS:
+            percents = allocation.get(etf, (0.0, 0.0))
+            if not isinstance(percents, (list, tuple)) or len(percents) != 2:
+                raise ValueError(f"strategy {name} {etf} must be [shares %, calls %]")
+            for value in percents:
+                _check_number(f"strategy {name} {etf}", value)
+            strategies[name][etf] = tuple(percents)
+    filled['strategies'] = strategies
+
+    for field in SCALAR_FIELDS:
+        _check_number(field, filled[field])
+    for etf, value in filled['dividend_yields'].items():
+        _check_number(f"dividend_yields.{etf}", value)
+    for holding in holdings:
+        for field in ['value', 'multiple']:
+            _check_number(f"holding {holding.get('ticker')} {field}", holding.get(field))
+    return filled
+
+
+def load_portfolios(path):
+    """Portfolios from a .json or .csv file, each filled in with DEFAULT_PORTFOLIO (see with_defaults)"""
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            portfolios = json.load(f)
+    else:
+        portfolios = _portfolios_from_csv(pd.read_csv(path))
+    filled = []
+    for i, portfolio in enumerate(portfolios):
+        account = portfolio.get('account', i + 1)
+        try:
+            filled.append(with_defaults(portfolio, account))
+        except ValueError as exc:
+            raise ValueError(f"Portfolio {account}: {exc}") from None
+    return filled
+
+
+def fetch_market_data(portfolios, rate=greeks.DEFAULT_RISK_FREE_RATE):
+    """Spot prices and the default-expiry TLT/EDV chains (with delta), fetched once for all portfolios.
+
+    missing_chains lists the ETFs whose chain could not be used (no expiries, a fetch
+    that failed or timed out, or no spot price); portfolios are evaluated without
+    their calls.
+    """
+    holding_tickers = {holding['ticker'] for portfolio in portfolios for holding in portfolio['holdings']}
+    tickers = ['TMF'] + tmf_core.STRATEGY_ETFS + sorted(holding_tickers - set(tmf_core.STRATEGY_ETFS) - {'TMF'})
+    spots = {ticker: price for ticker, price in market_data.get_spot_prices(tickers).items() if price is not None}
+
+    expirations = market_data.prefetch_expirations(tmf_core.STRATEGY_ETFS)
+    expiries = {
+        etf: expirations[etf][market_data.default_expiry_index(expirations[etf])]
+        for etf in tmf_core.STRATEGY_ETFS if expirations.get(etf)
+    }
+    chains = market_data.prefetch_option_chains(list(expiries.items()))
+    calls = {}
+    rolls = {}
+    for etf, expiry in expiries.items():
+        chain = chains.get((etf, expiry))
+        if chain is None or chain.empty or etf not in spots:
+            continue
+        deltas = greeks.get_chain_greeks(etf, expiry, spots[etf], rate)['delta']
+        calls[etf] = chain[['strike', 'bid']].assign(delta=deltas.to_numpy())
+        rolls[etf] = tmf_core.rolls_per_year(market_data.days_to_expiry(expiry))
+    missing_chains = [etf for etf in tmf_core.STRATEGY_ETFS if etf not in calls]
+    return {'spots': spots, 'calls': calls, 'rolls': rolls, 'missing_chains': missing_chains}
+
+
+def evaluate_portfolio(portfolio, market):
+    """Exposure, strategy, sell-call and projection tables of one portfolio, each tagged with its account"""
+    spots, calls = market['spots'], market['calls']
+    tmf_price = spots['TMF']
+    holdings = portfolio['holdings']
+    exposure_df = pd.DataFrame(tmf_core.compute_exposures(
+        portfolio['tmf_shares'],
+        tmf_price,
+        [holding['ticker'] for holding in holdings],
+        [holding['value'] for holding in holdings],
+        [spots.get(holding['ticker'], 0.0) for holding in holdings],
+        [holding['multiple'] for holding in holdings]
+    ))
+    net_needed_exposure = exposure_df['Net Exposure Needed'].iloc[-1]
+
+    long_offsets = {
+        'TLT': portfolio['long_offset'],
+        'EDV': tmf_core.linked_offset(portfolio['long_offset'], portfolio['long_multiple'], -LONG_OFFSET_LIMIT, LONG_OFFSET_LIMIT)
+    }
+    sell_offsets = {
+        'TLT': portfolio['tlt_offset'],
+        'EDV': tmf_core.linked_offset(portfolio['tlt_offset'], portfolio['strike_multiple'], -OFFSET_LIMIT, OFFSET_LIMIT)
+    }
+    sizing = []
+    contract_costs = {}
+    sold_calls = {}
+    for etf in tmf_core.STRATEGY_ETFS:
+        if etf not in calls:
+            continue
+        long_call = tmf_core.closest_call(calls[etf], spots[etf], long_offsets[etf])
+        sold_call = tmf_core.closest_call(calls[etf], spots[etf], sell_offsets[etf])
+        delta = None if np.isnan(long_call['delta']) else long_call['delta']
+        contract_exposure, contracts_needed, total_premium_cost = tmf_core.size_contracts(net_needed_exposure, spots[etf], delta, long_call['bid'])
+        sizing.append({
+            'ETF': etf,
+            'Per-Contract Exposure': contract_exposure,
+            'Contracts Needed': contracts_needed,
+            'Total Premium Cost': total_premium_cost
+        })
+        contract_costs[etf] = long_call['bid'] * 100
+        sold_calls[etf] = (sold_call['strike'], sold_call['bid'])
+
+    tables = tmf_core.evaluate_strategies(
+        portfolio['tmf_shares'] * tmf_price,
+        {name: {etf: tuple(split) for etf, split in allocations.items()} for name, allocations in portfolio['strategies'].items()},
+        {etf: spots.get(etf, 0.0) for etf in tmf_core.STRATEGY_ETFS},
+        contract_costs,
+        sold_calls,
+        portfolio['dividend_yields'],
+        rolls=market['rolls'],
+        upside_pct=portfolio['upside_pct'],
+        months=portfolio['months']
+    )
+    results = {
+        'exposures': tmf_core.combine_exposures(exposure_df, pd.DataFrame(sizing, columns=['ETF', 'Per-Contract Exposure', 'Contracts Needed', 'Total Premium Cost'])),
+        'strategies': tables['strategies'],
+        'sell_calls': tables['sell_calls'],
+        'projections': tables['projected'],
+    }
+    return {name: df.assign(account=portfolio['account']) for name, df in results.items()}
+
+
+def _init_worker(market):
+    global _market
+    _market = market
+
+
+def _evaluate_chunk(portfolios):
+    results = [evaluate_portfolio(portfolio, _market) for portfolio in portfolios]
+    return {name: pd.concat([result[name] for result in results], ignore_index=True) for name in TABLES}
+
+
+def evaluate_portfolios(portfolios, market, workers=None):
+    """Every portfolio's tables concatenated per table name, evaluated in chunks across a process pool"""
+    chunks = [portfolios[i:i + CHUNK_PORTFOLIOS] for i in range(0, len(portfolios), CHUNK_PORTFOLIOS)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        _init_worker(market)
+        results = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(market,)) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+    return {name: pd.concat([result[name] for result in results], ignore_index=True) for name in TABLES}
+
+
+def write_tables(tables, path, fmt='parquet'):
+    """Write each table to path/<name>.parquet (zstd) or path/<name>.csv, account first"""
+    os.makedirs(path, exist_ok=True)
+    for name, df in tables.items():
+        df = df[['account'] + [col for col in df.columns if col != 'account']]
+        if fmt == 'parquet':
+            df.to_parquet(os.path.join(path, f'{name}.parquet'), index=False, compression='zstd')
+        else:
+            df.to_csv(os.path.join(path, f'{name}.csv'), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate many TMF portfolios without the Streamlit UI")
+    parser.add_argument('portfolios', help="JSON or CSV file of portfolios")
+    parser.add_argument('output', help="Directory to write the result tables to")
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet', help="Output file format")
+    parser.add_argument('--snapshot', help="Replay market data from this snapshot directory instead of fetching it")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per core)")
+    parser.add_argument('--risk-free-rate', type=float, default=greeks.DEFAULT_RISK_FREE_RATE * 100, help="Risk-free rate for deltas (%%)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        market_data.set_replay_snapshot(args.snapshot)
+    started = time.perf_counter()
+    try:
+        portfolios = load_portfolios(args.portfolios)
+    except ValueError as exc:
+        parser.error(str(exc))
+    market = fetch_market_data(portfolios, rate=args.risk_free_rate / 100)
+    if 'TMF' not in market['spots']:
+        parser.error("Failed to fetch TMF price")
+    if market['missing_chains']:
+        print(f"Warning: no option chain for {', '.join(market['missing_chains'])}; its calls are left out of every table", file=sys.stderr)
+    tables = evaluate_portfolios(portfolios, market, workers=args.workers)
+    write_tables(tables, args.output, args.format)
+    elapsed = time.perf_counter() - started
+    print(f"Evaluated {len(portfolios)} portfolios in {elapsed:.1f}s; wrote {', '.join(TABLES)} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Benchmarks for the strategy pipeline on synthetic market data.
+
+Each stage of a rerun is timed on its own, against generated spot prices and call
+chains (hundreds of strikes, dozens of expiries), so no network access is needed:
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --output new.json --compare bench.json
+
+Results are written as JSON: one entry per stage with min/median/mean milliseconds,
+plus the library versions and git commit they were measured on.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+import call_picker
+import tmf_core
+
+DEFAULT_STRIKES = 300
+DEFAULT_EXPIRIES = 24
+DEFAULT_REPEAT = 20
+DEFAULT_SPOTS = {'TMF': 40.0, 'TLT': 88.0, 'EDV': 66.0}
+
+
+def synthetic_spots(seed=0):
+    """Spot prices near DEFAULT_SPOTS, jittered by up to 5%"""
+    rng = np.random.default_rng(seed)
+    return {ticker: round(price * (1 + rng.uniform(-0.05, 0.05)), 2) for ticker, price in DEFAULT_SPOTS.items()}
+
+
+def synthetic_chain(spot, days, n_strikes=DEFAULT_STRIKES, vol=0.18, seed=0):
+    """A call chain shaped like yfinance's: strikes around spot with intrinsic + time value bids"""
+    rng = np.random.default_rng(seed)
+    strikes = np.round(np.linspace(spot * 0.4, spot * 1.6, n_strikes), 1)
+    time_value = spot * vol * np.sqrt(days / 365.0) * 0.4 * np.exp(-((strikes - spot) / (spot * vol)) ** 2)
+    bid = np.round(np.maximum(spot - strikes, 0) + time_value, 2)
+    return pd.DataFrame({
+        'contractSymbol': [f"SYN{days:03d}C{int(strike * 1000):08d}" for strike in strikes],
+        'strike': strikes,
+        'lastPrice': bid,
+        'bid': bid,
+        'ask': np.round(bid * 1.02 + 0.01, 2),
+        'volume': rng.integers(0, 5000, n_strikes),
+        'openInterest': rng.integers(0, 50000, n_strikes),
+        'impliedVolatility': vol * (1 + rng.uniform(-0.1, 0.1, n_strikes)),
+    })
+
+
+def synthetic_chains(spots, etfs=tmf_core.STRATEGY_ETFS, n_expiries=DEFAULT_EXPIRIES, n_strikes=DEFAULT_STRIKES, today=None):
+    """{(etf, expiry): chain} for n_expiries weekly-then-monthly expiries per ETF"""
+    today = today or datetime.date.today()
+    days = [7 * (i + 1) if i < 8 else 30 * (i - 5) for i in range(n_expiries)]
+    return {
+        (etf, (today + datetime.timedelta(days=d)).isoformat()): synthetic_chain(spots[etf], d, n_strikes, seed=i)
+        for etf in etfs
+        for i, d in enumerate(days)
+    }
+
+
+def _time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': min(times), 'median_ms': statistics.median(times), 'mean_ms': statistics.fmean(times), 'repeat': repeat}
+
+
+def run_benchmarks(n_strikes=DEFAULT_STRIKES, n_expiries=DEFAULT_EXPIRIES, repeat=DEFAULT_REPEAT, seed=0):
+    """Time each pipeline stage on the same synthetic data; returns {stage: timings}"""
+    spots = synthetic_spots(seed)
+    chains = synthetic_chains(spots, n_expiries=n_expiries, n_strikes=n_strikes)
+    first_chain = {etf: next(calls for (e, _), calls in chains.items() if e == etf) for etf in tmf_core.STRATEGY_ETFS}
+    tickers = tmf_core.STRATEGY_ETFS
+    long_calls = {etf: tmf_core.closest_call(first_chain[etf], spots[etf], -10.0) for etf in tickers}
+    strategies = {
+        f"Strategy {i + 1}": {'TLT': (shares, 50.0 - shares), 'EDV': (50.0 - shares, shares)}
+        for i, shares in enumerate([0.0, 25.0, 50.0])
+    }
+    total_capital = 7270 * spots['TMF']
+    contract_costs = {etf: long_calls[etf]['bid'] * 100 for etf in tickers}
+    sold_calls = {
+        etf: tuple(tmf_core.closest_call(first_chain[etf], spots[etf], 5.0)[['strike', 'bid']])
+        for etf in tickers
+    }
+    dividend_yields = {'TLT': 3.9, 'EDV': 4.9}
+
+    def contract_sizing():
+        exposure_df = pd.DataFrame(tmf_core.compute_exposures(7270, spots['TMF'], tickers, [0.0, 0.0], [spots[t] for t in tickers], [2.2, 1.5]))
+        net_needed = exposure_df['Net Exposure Needed'].iloc[-1]
+        return exposure_df, [tmf_core.size_contracts(net_needed, spots[etf], 0.9, long_calls[etf]['bid']) for etf in tickers]
+
+    exposure_df, sizing = contract_sizing()
+    comparison_df = pd.DataFrame({
+        'ETF': tickers,
+        'Per-Contract Exposure': [s[0] for s in sizing],
+        'Contracts Needed': [s[1] for s in sizing],
+        'Total Premium Cost': [s[2] for s in sizing],
+    })
+
+    def merged_table():
+        merged_df = tmf_core.combine_exposures(exposure_df, comparison_df)
+        return tmf_core.format_table(merged_df, money=['Current Exposure', 'Net Exposure Needed', 'Total Premium Cost', 'Total Exposure', 'Per-Contract Exposure'])
+
+    def allocation():
+        rows = []
+        for name, allocations in strategies.items():
+            rows.extend(tmf_core.allocate_strategy(name, total_capital, allocations, spots, contract_costs))
+        strategies_df = pd.DataFrame(rows)
+        return strategies_df, tmf_core.summarize_strategies(strategies_df)
+
+    strategies_df, summary_df = allocation()
+
+    def call_picker_window():
+        return [call_picker.strike_window(call_picker.chain_picker(calls), spots[etf]) for (etf, _), calls in chains.items()]
+
+    def sell_call_selection():
+        return [tmf_core.closest_call(calls, spots[etf], 5.0) for (etf, _), calls in chains.items()]
+
+    def safe_call_filtering():
+        return [tmf_core.safe_short_calls(calls, long_calls[etf]['strike'], long_calls[etf]['bid']) for (etf, _), calls in chains.items()]
+
+    def cross_expiry_scan():
+        positions = {etf: (long_calls[etf]['strike'], long_calls[etf]['bid'], spots[etf]) for etf in tickers}
+        return tmf_core.scan_short_calls(chains, positions)
+
+    def projection():
+        sell_df = tmf_core.sell_call_income(strategies_df, summary_df, sold_calls, spots, dividend_yields)
+        combined_df = tmf_core.combine_summaries(summary_df, tmf_core.summarize_sell_calls(sell_df, summary_df))
+        return tmf_core.projected_returns(combined_df, 10.0, 12)
+
+    stages = {
+        'contract_sizing': contract_sizing,
+        'merged_table': merged_table,
+        'strategy_allocation': allocation,
+        'call_picker': call_picker_window,
+        'sell_call_selection': sell_call_selection,
+        'safe_call_filtering': safe_call_filtering,
+        'cross_expiry_scan': cross_expiry_scan,
+        'projection': projection,
+    }
+    return {name: _time(func, repeat) for name, func in stages.items()}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the strategy pipeline on synthetic data")
+    parser.add_argument('--output', default='benchmarks.json', help="JSON file to write the results to")
+    parser.add_argument('--strikes', type=int, default=DEFAULT_STRIKES, help="Strikes per synthetic chain")
+    parser.add_argument('--expiries', type=int, default=DEFAULT_EXPIRIES, help="Synthetic expiries per ETF")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per stage")
+    parser.add_argument('--compare', help="Earlier results file to print median ratios against")
+    args = parser.parse_args()
+
+    stages = run_benchmarks(args.strikes, args.expiries, args.repeat)
+    results = {
+        'recorded_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'strikes': args.strikes,
+        'expiries': args.expiries,
+        'stages': stages,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['stages']
+    for name, timing in stages.items():
+        line = f"{name:<22} {timing['median_ms']:9.3f} ms median"
+        if name in baseline:
+            line += f"  ({timing['median_ms'] / baseline[name]['median_ms']:.2f}x vs {args.compare})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Strike-windowed call contract picker for the options apps.
+
+A chain can list hundreds of strikes, so the contract selectbox only shows a window
+of them around the target strike from the ±% slider, starting on the strike nearest
+to it. The labels for a whole chain are built at once with vectorized string
+operations and cached with the chain's strikes in ascending order, so moving the
+target only costs a binary search.
+"""
+import numpy as np
+
+import market_data
+
+# Strikes shown on each side of the one nearest the target
+DEFAULT_WINDOW = 10
+
+# Keyed by (ticker, expiry); an entry is rebuilt when the chain cache hands out a new chain
+_picker_cache = market_data.TTLCache(ttl=market_data.DEFAULT_CHAIN_TTL, maxsize=64)
+
+
+def _text(values):
+    """Any numeric column as strings, the way str() prints each value"""
+    return np.asarray(values).astype(np.dtypes.StringDType())
+
+
+def _two_decimals(values):
+    """Numbers as strings with two decimals ('16.45'), 'nan' where missing"""
+    values = np.asarray(values, dtype=float)
+    cents = np.round(np.nan_to_num(values) * 100).astype(np.int64)
+    text = np.strings.add(np.strings.add(_text(cents // 100), '.'), np.strings.zfill(_text(cents % 100), 2))
+    return np.where(np.isnan(values), 'nan', text)
+
+
+def call_labels(calls):
+    """Selectbox label of every contract in a chain, in chain order"""
+    parts = [
+        "Strike: $", _two_decimals(calls['strike']),
+        " | Bid: $", _two_decimals(calls['bid']),
+        " | Ask: $", _two_decimals(calls['ask']),
+        " | Volume: ", _text(calls['volume']),
+        " | OI: ", _text(calls['openInterest']),
+    ]
+    labels = np.full(len(calls), '', dtype=np.dtypes.StringDType())
+    for part in parts:
+        labels = np.strings.add(labels, part)
+    return labels.tolist()
+
+
+def chain_picker(calls):
+    """Labels plus the chain's row positions and strikes sorted by strike"""
+    strikes = calls['strike'].to_numpy(dtype=float)
+    order = np.argsort(strikes, kind='stable')
+    return {'labels': call_labels(calls), 'order': order, 'strikes': strikes[order]}
+
+
+def get_chain_picker(ticker, expiry):
+    """chain_picker() for the cached (ticker, expiry) chain"""
+    calls = market_data.get_option_chain(ticker, expiry)
+    entry = _picker_cache.get((ticker, expiry))
+    if entry is None or entry[0] is not calls:
+        entry = (calls, chain_picker(calls))
+        _picker_cache.set((ticker, expiry), entry)
+    return entry[1]
+
+
+def strike_window(picker, target_price, half_width=DEFAULT_WINDOW):
+    """Row positions of the strikes around target_price, in strike order, and the index of the nearest one"""
+    strikes = picker['strikes']
+    n = int(np.count_nonzero(~np.isnan(strikes)))
+    if n == 0:
+        return [], None
+    i = int(np.searchsorted(strikes[:n], target_price))
+    nearest = i if i < n and (i == 0 or strikes[i] - target_price < target_price - strikes[i - 1]) else i - 1
+    lo = max(0, nearest - half_width)
+    hi = min(n, nearest + half_width + 1)
+    return picker['order'][lo:hi].tolist(), nearest - lo
+
+
+def clear_picker_cache():
+    _picker_cache.clear()
@@ -0,0 +1,100 @@
+"""Vectorized Black-Scholes greeks for whole call chains.
+
+yfinance chains carry an impliedVolatility column but no greeks. The functions
+here compute prices and delta, gamma, theta and vega for every row at once with NumPy.
+Theta is per calendar day and vega per 1 volatility point (0.01).
+"""
+import numpy as np
+import pandas as pd
+
+import market_data
+
+DEFAULT_RISK_FREE_RATE = 0.045
+
+# Greeks of a chain only change when the chain, spot or inputs do; same lifetime as the chain cache
+_greeks_cache = market_data.TTLCache(ttl=market_data.DEFAULT_CHAIN_TTL, maxsize=64)
+
+
+def _norm_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation (|error| < 1.5e-7); avoids a SciPy dependency
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def years_to_expiry(expiry, today=None):
+    """Year fraction until an expiry date string ('YYYY-MM-DD'); at least one day"""
+    return max(market_data.days_to_expiry(expiry, today), 1) / 365.0
+
+
+def call_greeks(spot, strikes, years, vols, rate=DEFAULT_RISK_FREE_RATE, dividend_yield=0.0):
+    """Delta, gamma, theta and vega of European calls, broadcast over the array arguments.
+
+    Rows without a usable volatility get NaN greeks so callers can tell them apart.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    vols = np.asarray(vols, dtype=float)
+    years = np.asarray(years, dtype=float)
+    valid = (vols > 1e-4) & (strikes > 0) & (spot > 0)
+    vols = np.where(valid, vols, np.nan)
+
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / np.where(strikes > 0, strikes, np.nan)) + (rate - dividend_yield + 0.5 * vols ** 2) * years) / (vols * sqrt_t)
+    d2 = d1 - vols * sqrt_t
+    carry = np.exp(-dividend_yield * years)
+    discount = np.exp(-rate * years)
+    pdf_d1 = _norm_pdf(d1)
+
+    delta = carry * _norm_cdf(d1)
+    gamma = carry * pdf_d1 / (spot * vols * sqrt_t)
+    theta = (
+        -spot * carry * pdf_d1 * vols / (2 * sqrt_t)
+        - rate * strikes * discount * _norm_cdf(d2)
+        + dividend_yield * spot * carry * _norm_cdf(d1)
+    ) / 365.0
+    vega = spot * carry * pdf_d1 * sqrt_t / 100.0
+    return {'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega}
+
+
+def call_price(spot, strikes, years, vols, rate=DEFAULT_RISK_FREE_RATE, dividend_yield=0.0):
+    """Black-Scholes price of European calls, broadcast over all array arguments"""
+    spot = np.asarray(spot, dtype=float)
+    strikes = np.asarray(strikes, dtype=float)
+    years = np.maximum(np.asarray(years, dtype=float), 1e-6)
+    vols = np.maximum(np.asarray(vols, dtype=float), 1e-4)
+    sqrt_t = np.sqrt(years)
+    d1 = (np.log(spot / strikes) + (rate - dividend_yield + 0.5 * vols ** 2) * years) / (vols * sqrt_t)
+    d2 = d1 - vols * sqrt_t
+    return spot * np.exp(-dividend_yield * years) * _norm_cdf(d1) - strikes * np.exp(-rate * years) * _norm_cdf(d2)
+
+
+def chain_greeks(calls, spot, expiry, rate=DEFAULT_RISK_FREE_RATE, dividend_yield=0.0, today=None):
+    """Greeks for every row of a call chain, as a DataFrame aligned with calls' index"""
+    years = years_to_expiry(expiry, today)
+    vols = calls['impliedVolatility'] if 'impliedVolatility' in calls.columns else np.full(len(calls), np.nan)
+    return pd.DataFrame(
+        call_greeks(spot, calls['strike'].to_numpy(), years, np.asarray(vols, dtype=float), rate, dividend_yield),
+        index=calls.index
+    )
+
+
+def get_chain_greeks(ticker, expiry, spot, rate=DEFAULT_RISK_FREE_RATE, dividend_yield=0.0):
+    """chain_greeks() for the cached (ticker, expiry) chain, itself cached per inputs"""
+    calls = market_data.get_option_chain(ticker, expiry)
+    key = (ticker, expiry, round(float(spot), 4), rate, dividend_yield)
+    entry = _greeks_cache.get(key)
+    # Rebuilt when the chain cache hands out a refetched chain, whose rows may differ
+    if entry is None or entry[0] is not calls:
+        entry = (calls, chain_greeks(calls, spot, expiry, rate, dividend_yield))
+        _greeks_cache.set(key, entry)
+    return entry[1]
+
+
+def clear_greeks_cache():
+    _greeks_cache.clear()
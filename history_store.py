@@ -0,0 +1,262 @@
+"""Columnar, year-partitioned store for the long 30Y yield / swap histories in swap.py.
+
+ingest() converts a downloaded history CSV (30y.csv, 30y_swap.csv) into one
+uncompressed Arrow (Feather v2) file per calendar year:
+
+    history/<series>/2024.arrow
+    history/<series>/2025.arrow
+    history/<series>/source.json    (mtime and size of the CSV it came from)
+
+Each file holds a date32 Date column and float32 value columns, in date order.
+Reads memory-map only the years a range needs, so a "1 Year" chart touches two
+small files however many decades of history the series covers, and load time and
+resident memory follow the window shown rather than the full history.
+
+sync() re-ingests a series whenever its CSV is replaced by a newer download.
+Ingest one by hand:
+
+    python history_store.py 30y.csv history/yield_30y
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+import moving_averages
+from ttl_cache import TTLCache
+
+HISTORY_DIR = 'history'
+
+SWAP = 'swap_30y'
+YIELD = 'yield_30y'
+
+# Series -> source CSV
+SOURCES = {
+    SWAP: '30y_swap.csv',
+    YIELD: '30y.csv',
+}
+
+VALUE_COLUMNS = ['Price', 'Open', 'High', 'Low', 'Change %']
+SUFFIXES = {SWAP: '_swap', YIELD: '_yield'}
+
+SOURCE_FILE = 'source.json'
+PARTITION_SUFFIX = '.arrow'
+
+# Serializes ingests within the process; readers never wait
+_ingest_lock = threading.Lock()
+
+# Keyed by the history CSVs' (path, mtime, size) and the days read (or the moving average
+# windows computed); a replaced CSV changes the key
+_history_cache = TTLCache(ttl=float('inf'), maxsize=32)
+
+
+def _signature(path):
+    """(path, mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return path, stat.st_mtime, stat.st_size
+
+
+def series_dir(series):
+    return os.path.join(HISTORY_DIR, series)
+
+
+# --- Ingest ---
+
+def read_csv(path):
+    """A history CSV as Date plus float32 value columns, one row per date in date order (None without Date / Price)"""
+    df = pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    if 'Date' not in df or 'Price' not in df:
+        return None
+    df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y', errors='coerce')
+    df = df.dropna(subset=['Date']).drop_duplicates(subset=['Date'], keep='last')
+    if 'Change %' in df:
+        df['Change %'] = df['Change %'].str.rstrip('%')
+    for column in VALUE_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column].str.replace(',', ''), errors='coerce').astype(np.float32)
+        else:
+            df[column] = np.full(len(df), np.nan, dtype=np.float32)
+    return df.sort_values('Date', kind='mergesort')[['Date'] + VALUE_COLUMNS].reset_index(drop=True)
+
+
+def _write_atomic(directory, name, write):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def ingest(csv_path, directory):
+    """Rewrite directory's year partitions from a history CSV; returns rows written (0 if the CSV is unusable)"""
+    signature = _signature(csv_path)
+    df = read_csv(csv_path) if signature is not None else None
+    if df is None:
+        return 0
+    os.makedirs(directory, exist_ok=True)
+    table = df.assign(Date=df['Date'].dt.date)
+    years = df['Date'].dt.year
+    written = set()
+    for year, part in table.groupby(years, sort=True):
+        name = f'{year}{PARTITION_SUFFIX}'
+        _write_atomic(directory, name, lambda path: feather.write_feather(
+            part.reset_index(drop=True), path, compression='uncompressed'))
+        written.add(name)
+    for name in os.listdir(directory):
+        if name.endswith(PARTITION_SUFFIX) and name not in written:
+            os.unlink(os.path.join(directory, name))
+    # Written last: a crash part-way leaves the old signature, so the next sync ingests again
+    source = {'mtime': signature[1], 'size': signature[2]}
+    _write_atomic(directory, SOURCE_FILE, lambda path: _dump_json(source, path))
+    return len(df)
+
+
+def _dump_json(obj, path):
+    with open(path, 'w') as f:
+        json.dump(obj, f)
+
+
+def _ingested(directory):
+    try:
+        with open(os.path.join(directory, SOURCE_FILE)) as f:
+            source = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return source['mtime'], source['size']
+
+
+def sync():
+    """Ingest every series whose CSV is new or was replaced since its last ingest"""
+    with _ingest_lock:
+        for series, csv_path in SOURCES.items():
+            signature = _signature(csv_path)
+            if signature is not None and _ingested(series_dir(series)) != signature[1:]:
+                ingest(csv_path, series_dir(series))
+
+
+# --- Reads ---
+
+def years(series):
+    """Calendar years series has a partition for, ascending"""
+    try:
+        names = os.listdir(series_dir(series))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-len(PARTITION_SUFFIX)]) for name in names
+                  if name.endswith(PARTITION_SUFFIX) and name[:-len(PARTITION_SUFFIX)].isdigit())
+
+
+def _read_partition(series, year, columns=None):
+    path = os.path.join(series_dir(series), f'{year}{PARTITION_SUFFIX}')
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+
+def read(series, first_year=None):
+    """Date plus value columns of series from first_year on (default: all years), in date order"""
+    wanted = [year for year in years(series) if first_year is None or year >= first_year]
+    if not wanted:
+        return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'),
+                             **{column: pd.Series(dtype=np.float32) for column in VALUE_COLUMNS}})
+    df = pd.concat([_read_partition(series, year).to_pandas() for year in wanted], ignore_index=True)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def last_date(series):
+    """Latest date series has, from its newest partition (None if it has none)"""
+    available = years(series)
+    if not available:
+        return None
+    dates = _read_partition(series, available[-1], ['Date']).column('Date')
+    return pd.Timestamp(dates[len(dates) - 1].as_py()) if len(dates) else None
+
+
+def has_history():
+    return all(years(series) for series in SOURCES)
+
+
+def _merged(first_year):
+    frames = [read(series, first_year).add_suffix(SUFFIXES[series]).rename(columns={'Date' + SUFFIXES[series]: 'Date'})
+              for series in (SWAP, YIELD)]
+    df = pd.merge(frames[0], frames[1], on='Date')
+    df['spread'] = df['Price_swap'] - df['Price_yield']
+    return df
+
+
+def _last_days(df, days):
+    """Rows of df (sorted by Date) within days of its latest date (all of them for None), found by binary search"""
+    if days is None or df.empty:
+        return df
+    dates = df['Date']
+    start = dates.searchsorted(dates.iloc[-1] - pd.Timedelta(days=days), side='left')
+    return df.iloc[start:].reset_index(drop=True)
+
+
+def _read_history(days):
+    if days is None:
+        return _merged(None)
+    latest = [last_date(series) for series in (SWAP, YIELD)]
+    if None in latest:
+        return _merged(None)
+    window = pd.Timedelta(days=days)
+    first_year = (min(latest) - window).year
+    df = _merged(first_year)
+    if df.empty:
+        return df
+    # Measured back from the latest date both series have, which can start a year earlier
+    if (df['Date'].iloc[-1] - window).year < first_year:
+        df = _merged((df['Date'].iloc[-1] - window).year)
+    return _last_days(df, days)
+
+
+def read_history(days=None, windows=()):
+    """Dates on which both 30Y histories have a price, in date order.
+
+    Every value column is included as float32, suffixed _swap or _yield (Price_swap,
+    Change %_yield, ...), plus spread (Price_swap - Price_yield). With days, only the
+    year partitions holding the last days days (back from the latest common date)
+    are read.
+
+    With windows, Yield_MA_<window> and Spread_MA_<window> columns are added for
+    each window, computed once over the full history so the first rows of a short
+    range still average over the days before it; the full history is then read
+    whatever days is. Frames are cached until either history CSV changes; callers
+    get their own copy.
+    """
+    signatures = (_signature(SOURCES[SWAP]), _signature(SOURCES[YIELD]))
+    if windows:
+        key = signatures + ('averages', tuple(windows))
+        df = _history_cache.get(key)
+        if df is None:
+            df = moving_averages.add_moving_averages(read_history(), {'Price_yield': 'Yield', 'spread': 'Spread'}, windows)
+            _history_cache.set(key, df)
+        return _last_days(df, days).copy()
+    key = signatures + (days,)
+    df = _history_cache.get(key)
+    if df is None:
+        df = _read_history(days)
+        _history_cache.set(key, df)
+    return df.copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a 30Y history CSV into year-partitioned Arrow files")
+    parser.add_argument('csv', help="History CSV (Date, Price, Open, High, Low, Change %)")
+    parser.add_argument('directory', help="Partition directory to (re)write")
+    args = parser.parse_args()
+    print(f"{ingest(args.csv, args.directory)} rows ingested into {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Shared market data layer for the TMF conversion apps (portfolio.py, tlt_tmf.py).
+
+Everything lives at module level, so it is shared by every Streamlit session
+served from the same process: a slider nudge in one browser tab reuses the
+quotes another tab already paid for. Cache misses for the same data that arrive
+together are coalesced into one upstream fetch, which goes out over yfinance's
+single shared HTTP session.
+
+Data is fetched through a provider (see providers.py), yfinance by default.
+Setting MARKET_DATA_SNAPSHOT to a directory written by snapshot.py switches the
+module to replay mode: every lookup is answered from that snapshot and yfinance
+is never contacted. MARKET_DATA_FIXTURES does the same with a FakeProvider
+fixture directory.
+"""
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import pandas as pd
+
+import providers
+from ttl_cache import TTLCache
+
+# Default freshness windows, in seconds
+DEFAULT_PRICE_TTL = 300
+DEFAULT_CHAIN_TTL = 300
+DEFAULT_EXPIRATIONS_TTL = 3600
+DEFAULT_HISTORY_TTL = 6 * 3600
+DEFAULT_DIVIDENDS_TTL = 6 * 3600
+
+# Seconds a concurrent prefetch waits for its slowest request
+DEFAULT_FETCH_TIMEOUT = 10
+
+
+_price_cache = TTLCache(ttl=DEFAULT_PRICE_TTL, maxsize=256)
+# Keyed by ticker; the listed expiry dates change at most once a day
+_expirations_cache = TTLCache(ttl=DEFAULT_EXPIRATIONS_TTL, maxsize=64)
+# Keyed by (ticker, expiry); a call chain is a few hundred rows, so 64 keeps memory small
+_chain_cache = TTLCache(ttl=DEFAULT_CHAIN_TTL, maxsize=64)
+# Keyed by (ticker, period); daily closes only move once a day
+_history_cache = TTLCache(ttl=DEFAULT_HISTORY_TTL, maxsize=64)
+# Keyed by ticker
+_dividends_cache = TTLCache(ttl=DEFAULT_DIVIDENDS_TTL, maxsize=64)
+
+
+_provider = providers.YFinanceProvider()
+
+# Fetches currently running, keyed like the caches; see coalesce()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_coalesced = 0
+
+# Per-thread callback told about every upstream fetch; see observe_fetches()
+_observer = threading.local()
+
+
+@contextmanager
+def observe_fetches(callback):
+    """Call callback(key, seconds, coalesced) for every fetch made by this thread (and its prefetches)"""
+    previous = getattr(_observer, 'callback', None)
+    _observer.callback = callback
+    try:
+        yield
+    finally:
+        _observer.callback = previous
+
+
+def _notify(key, started, coalesced):
+    callback = getattr(_observer, 'callback', None)
+    if callback is not None:
+        callback(key, time.perf_counter() - started, coalesced)
+
+
+def coalesce(key, fetch):
+    """Run fetch() once for every caller asking for key at the same time.
+
+    The first caller runs it; callers arriving while it is in flight wait for and
+    share its result (or its exception). Nothing is kept once it finishes, so this
+    never serves stale data; the TTL caches do the caching.
+    """
+    global _coalesced
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+        else:
+            _coalesced += 1
+    started = time.perf_counter()
+    if not leader:
+        try:
+            return future.result()
+        finally:
+            _notify(key, started, True)
+    try:
+        result = fetch()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        _notify(key, started, False)
+
+
+def set_provider(provider):
+    """Fetch everything through provider from now on, dropping data cached from the previous one"""
+    global _provider
+    _provider = provider
+    clear_price_cache()
+    clear_option_cache()
+
+
+def get_provider():
+    return _provider
+
+
+def set_replay_snapshot(path):
+    """Answer every lookup from the snapshot at path (None returns to live yfinance data)"""
+    set_provider(providers.SnapshotProvider(path) if path else providers.YFinanceProvider())
+
+
+def replay_snapshot():
+    """The Snapshot being replayed, or None when serving live data"""
+    return _provider.snapshot if isinstance(_provider, providers.SnapshotProvider) else None
+
+
+def get_spot_prices(tickers, max_age=None):
+    """Latest close for every ticker, as a dict of ticker -> price (None when unavailable).
+
+    Tickers already fresh in the shared cache are served from it; the rest are fetched
+    together in a single provider request (for yfinance, one batched download with
+    per-ticker retries, so one bad symbol never costs the others their quotes).
+    Failures are never cached.
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    quotes = {ticker: _price_cache.get(ticker, max_age=max_age) for ticker in tickers}
+    stale = [ticker for ticker, price in quotes.items() if price is None]
+    if stale:
+        quotes.update(coalesce(('prices', tuple(stale)), lambda: _fetch_closes(stale)))
+    return quotes
+
+
+def _fetch_closes(tickers):
+    closes = _provider.spot_prices(tickers)
+    for ticker in tickers:
+        if closes.get(ticker) is not None:
+            _price_cache.set(ticker, closes[ticker])
+    return {ticker: closes.get(ticker) for ticker in tickers}
+
+
+def clear_price_cache():
+    """Drop every cached price, price history and dividend list so the next lookup goes back to the provider"""
+    _price_cache.clear()
+    _history_cache.clear()
+    _dividends_cache.clear()
+
+
+def get_expirations(ticker):
+    """Listed option expiry dates for ticker (as 'YYYY-MM-DD' strings), cached per ticker"""
+    expirations = _expirations_cache.get(ticker)
+    if expirations is None:
+        expirations = coalesce(('expirations', ticker), lambda: _fetch_expirations(ticker))
+    return expirations
+
+
+def _fetch_expirations(ticker):
+    expirations = tuple(_provider.expirations(ticker))
+    if expirations:
+        _expirations_cache.set(ticker, expirations)
+    return expirations
+
+
+def get_option_chain(ticker, expiry):
+    """Call chain for (ticker, expiry), cached and shared by every caller.
+
+    The returned DataFrame is shared between sessions: treat it as read-only and
+    copy it before adding columns.
+    """
+    key = (ticker, expiry)
+    calls = _chain_cache.get(key)
+    if calls is None:
+        calls = coalesce(('chain',) + key, lambda: _fetch_option_chain(ticker, expiry))
+    return calls
+
+
+def _fetch_option_chain(ticker, expiry):
+    calls = _provider.option_chain(ticker, expiry)
+    _chain_cache.set((ticker, expiry), calls)
+    return calls
+
+
+def default_expiry_index(expirations, min_days=30):
+    """Index of the first expiry at least min_days out (0 if there is none)"""
+    today = datetime.date.today()
+    for i, exp in enumerate(expirations):
+        try:
+            exp_date = datetime.datetime.strptime(exp, "%Y-%m-%d").date()
+        except Exception:
+            continue
+        if (exp_date - today).days >= min_days:
+            return i
+    return 0
+
+
+def days_to_expiry(expiry, today=None):
+    """Calendar days from today until an expiry date string ('YYYY-MM-DD')"""
+    today = today or datetime.date.today()
+    return (datetime.datetime.strptime(expiry, "%Y-%m-%d").date() - today).days
+
+
+# Shared by every session; each rerun's requests all fit in the pool at once
+_fetch_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="market-data")
+
+
+def _run_concurrently(func, keys, timeout):
+    """Call func(*key) for every key on the shared pool, waiting at most timeout seconds.
+
+    Returns {key: result} for the calls that finished in time without raising.
+    Slower calls keep running in the background and still fill the caches.
+    """
+    callback = getattr(_observer, 'callback', None)
+
+    def call(*key):
+        # Fetches on the pool report to the observer of the thread that asked for them
+        with observe_fetches(callback):
+            return func(*key)
+
+    futures = {key: _fetch_pool.submit(call, *key) for key in dict.fromkeys(keys)}
+    done, _ = wait(futures.values(), timeout=timeout)
+    return {
+        key: future.result()
+        for key, future in futures.items()
+        if future in done and future.exception() is None
+    }
+
+
+def prefetch_expirations(tickers, timeout=DEFAULT_FETCH_TIMEOUT):
+    """Fetch expiry lists for all tickers in parallel; returns {ticker: expirations}"""
+    results = _run_concurrently(get_expirations, [(ticker,) for ticker in tickers if ticker], timeout)
+    return {key[0]: expirations for key, expirations in results.items()}
+
+
+def prefetch_option_chains(requests, timeout=DEFAULT_FETCH_TIMEOUT):
+    """Fetch every (ticker, expiry) call chain in parallel; returns {(ticker, expiry): calls}"""
+    return _run_concurrently(get_option_chain, requests, timeout)
+
+
+def get_price_history(tickers, period="2y"):
+    """Daily closes for tickers over period, one column per ticker (NaN before a ticker's first close).
+
+    Cached per (ticker, period); uncached tickers are fetched in one provider request.
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    closes = {ticker: _history_cache.get((ticker, period)) for ticker in tickers}
+    missing = [ticker for ticker, series in closes.items() if series is None]
+    if missing:
+        closes.update(coalesce(('history', period, tuple(missing)), lambda: _fetch_history(missing, period)))
+    return pd.DataFrame(closes)
+
+
+def _fetch_history(tickers, period):
+    history = _provider.price_history(tickers, period)
+    closes = {}
+    for ticker in tickers:
+        series = history[ticker].dropna() if ticker in history.columns else pd.Series(dtype=float)
+        if not series.empty:
+            _history_cache.set((ticker, period), series)
+        closes[ticker] = series
+    return closes
+
+
+def get_dividends(ticker):
+    """Dividend per share on each ex-date for ticker, cached per ticker"""
+    dividends = _dividends_cache.get(ticker)
+    if dividends is None:
+        dividends = coalesce(('dividends', ticker), lambda: _fetch_dividends(ticker))
+    return dividends
+
+
+def _fetch_dividends(ticker):
+    dividends = _provider.dividends(ticker)
+    _dividends_cache.set(ticker, dividends)
+    return dividends
+
+
+def clear_option_cache():
+    """Drop every cached expiry list and option chain"""
+    _expirations_cache.clear()
+    _chain_cache.clear()
+
+
+def coalesced_requests():
+    """How many lookups were served by joining a fetch already in flight"""
+    return _coalesced
+
+
+def cache_stats():
+    """Hit/miss/size counters for each market data cache"""
+    return {
+        'prices': _price_cache.stats(),
+        'expirations': _expirations_cache.stats(),
+        'chains': _chain_cache.stats(),
+        'history': _history_cache.stats(),
+        'dividends': _dividends_cache.stats(),
+    }
+
+
+if os.environ.get('MARKET_DATA_SNAPSHOT'):
+    set_replay_snapshot(os.environ['MARKET_DATA_SNAPSHOT'])
+elif os.environ.get('MARKET_DATA_FIXTURES'):
+    set_provider(providers.FakeProvider.from_directory(os.environ['MARKET_DATA_FIXTURES']))
@@ -0,0 +1,142 @@
+"""Seeded Monte Carlo projection of the TLT/EDV strategies (and holding TMF).
+
+Correlated TLT/EDV/TMF prices are simulated as geometric Brownian motion on a
+monthly grid. For each path, every strategy is valued with the same position
+model the strategy tables use:
+
+- shares gain the price change plus their dividend yield,
+- long calls pay max(S_T - strike, 0) at the horizon, minus the premium paid,
+- every contract held sells one call a month at the chosen strike offset, collecting
+  the premium and giving back anything the month's move takes above that strike.
+
+Paths are generated in fixed-size chunks, each with its own child seed. Results are
+therefore identical whether the chunks run in this process or across a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ASSETS = ['TLT', 'EDV', 'TMF']
+TRADING_DAYS = 252
+CHUNK_PATHS = 50_000
+# Above this many paths the chunks are spread over a process pool
+PARALLEL_PATH_THRESHOLD = 200_000
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def estimate_parameters(history):
+    """Annualized volatility, correlation and beta to TLT from daily closes (one column per asset)"""
+    returns = np.log(history[ASSETS]).diff().dropna()
+    vols = returns.std() * np.sqrt(TRADING_DAYS)
+    corr = returns.corr()
+    betas = returns.cov()['TLT'] / returns['TLT'].var()
+    return vols, corr, betas
+
+
+def atm_implied_vol(calls, spot):
+    """Implied volatility of the strike closest to spot (NaN if the chain has none)"""
+    if calls.empty or 'impliedVolatility' not in calls.columns:
+        return np.nan
+    return float(calls.loc[(calls['strike'] - spot).abs().idxmin(), 'impliedVolatility'])
+
+
+def drifts_from_upside(upside_pct, months, betas):
+    """Annual log drifts so TLT is expected to move upside_pct over months, others by their beta"""
+    years = months / 12
+    tlt_drift = np.log(max(1 + upside_pct / 100, 1e-6)) / years
+    return pd.Series({asset: tlt_drift * betas.get(asset, 1.0) for asset in ASSETS})
+
+
+def build_positions(strategies_df, long_calls, sold_calls, sell_offsets, prices, dividend_yields, rolls, tmf_shares):
+    """Position arrays for simulate_pnl: one row per strategy, plus a final "Hold TMF" row.
+
+    long_calls and sold_calls map ETF -> (strike, premium); sell_offsets are strike
+    offsets in percent of spot and rolls the times a year the sold call is re-sold.
+    """
+    strategies = list(dict.fromkeys(strategies_df['Strategy']))
+    names = strategies + ['Hold TMF']
+    shape = (len(names), len(ASSETS))
+    positions = {
+        'shares': np.zeros(shape),
+        'long_contracts': np.zeros(shape),
+        'short_contracts': np.zeros(shape),
+        'long_strike': np.zeros(len(ASSETS)),
+        'long_premium': np.zeros(len(ASSETS)),
+        'sell_offset': np.zeros(len(ASSETS)),
+        'monthly_premium_frac': np.zeros(len(ASSETS)),
+        'dividend_yield': np.zeros(len(ASSETS)),
+    }
+    for col, key in [('Shares Bought', 'shares'), ('Contracts Bought', 'long_contracts'), ('Total Contracts', 'short_contracts')]:
+        for strategy, etf, value in zip(strategies_df['Strategy'], strategies_df['ETF'], strategies_df[col]):
+            positions[key][strategies.index(strategy), ASSETS.index(etf)] = value
+    positions['shares'][-1, ASSETS.index('TMF')] = tmf_shares
+
+    for etf in ['TLT', 'EDV']:
+        a = ASSETS.index(etf)
+        price = prices.get(etf, 0.0)
+        if etf in long_calls:
+            positions['long_strike'][a], positions['long_premium'][a] = long_calls[etf]
+        if etf in sold_calls and price > 0:
+            positions['sell_offset'][a] = sell_offsets.get(etf, 0.0) / 100
+            # Premium as a fraction of spot, re-earned rolls / 12 times a month
+            positions['monthly_premium_frac'][a] = sold_calls[etf][1] / price * rolls.get(etf, 12) / 12
+        positions['dividend_yield'][a] = dividend_yields.get(etf, 0.0) / 100
+    return names, positions
+
+
+def _simulate_chunk(seed, n_paths, spots, vols, corr, drifts, positions, months):
+    rng = np.random.default_rng(seed)
+    dt = 1 / 12
+    chol = np.linalg.cholesky(corr)
+    shocks = rng.standard_normal((n_paths, months, len(spots))) @ chol.T
+    log_steps = (drifts - 0.5 * vols ** 2) * dt + vols * np.sqrt(dt) * shocks
+    paths = spots * np.exp(np.cumsum(log_steps, axis=1))
+    starts = np.concatenate([np.broadcast_to(spots, (n_paths, 1, len(spots))), paths[:, :-1]], axis=1)
+    terminal = paths[:, -1]
+
+    # Per-unit P&L of each instrument, shape (n_paths, assets)
+    share_pnl = terminal - spots + (starts * positions['dividend_yield'] * dt).sum(axis=1)
+    long_call_pnl = 100 * (np.maximum(terminal - positions['long_strike'], 0) - positions['long_premium'])
+    capped = np.maximum(paths - starts * (1 + positions['sell_offset']), 0)
+    short_call_pnl = 100 * (starts * positions['monthly_premium_frac'] - capped).sum(axis=1)
+
+    has_short = positions['monthly_premium_frac'] > 0
+    return (
+        share_pnl @ positions['shares'].T
+        + long_call_pnl @ positions['long_contracts'].T
+        + (short_call_pnl * has_short) @ positions['short_contracts'].T
+    ).astype(np.float32)
+
+
+def simulate_pnl(spots, vols, corr, drifts, positions, months, n_paths=100_000, seed=0, workers=None):
+    """P&L of every position row at the horizon, shape (n_paths, rows); reproducible for a given seed"""
+    spots = np.asarray([spots[a] for a in ASSETS], dtype=float)
+    vols = np.asarray([vols[a] for a in ASSETS], dtype=float)
+    drifts = np.asarray([drifts[a] for a in ASSETS], dtype=float)
+    corr = np.asarray(pd.DataFrame(corr).loc[ASSETS, ASSETS], dtype=float)
+    months = max(int(months), 1)
+
+    chunk_sizes = [CHUNK_PATHS] * (n_paths // CHUNK_PATHS) + ([n_paths % CHUNK_PATHS] if n_paths % CHUNK_PATHS else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [(child, size, spots, vols, corr, drifts, positions, months) for child, size in zip(seeds, chunk_sizes)]
+    if n_paths > PARALLEL_PATH_THRESHOLD and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers or min(len(args), os.cpu_count() or 1)) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*chunk_args) for chunk_args in args]
+    return np.concatenate(chunks)
+
+
+def summarize_distribution(pnl, names, capital, months):
+    """Mean, percentiles and loss probability of each row's return on capital, plus annualized median"""
+    capital = np.asarray(capital, dtype=float)
+    returns = np.divide(pnl, capital, out=np.zeros_like(pnl, dtype=float), where=capital > 0) * 100
+    percentiles = np.percentile(returns, PERCENTILES, axis=0)
+    summary = pd.DataFrame({'Strategy': names, 'Mean Return (%)': returns.mean(axis=0)})
+    for p, values in zip(PERCENTILES, percentiles):
+        summary[f'P{p} Return (%)'] = values
+    summary['Annualized Median (%)'] = ((1 + np.maximum(percentiles[PERCENTILES.index(50)], -100) / 100) ** (12 / months) - 1) * 100
+    summary['Probability of Loss (%)'] = (returns < 0).mean(axis=0) * 100
+    return summary
@@ -0,0 +1,45 @@
+"""Trailing moving averages for the swap.py charts, every window in one pass.
+
+Each series is summed cumulatively once (NaNs counted out); the mean over any
+window is then the difference of two cumulative sums divided by the difference of
+two counts, so adding a window costs one vectorized subtraction rather than another
+rolling scan. Results match Series.rolling(window, min_periods=1).mean().
+
+Series must be in ascending date order, and averages are taken over the full
+history before a chart slices out its range, so the first points of a short range
+still average over the days before it.
+"""
+import numpy as np
+
+# Windows (in rows, i.e. trading days) offered as checkboxes on every chart
+STANDARD_WINDOWS = [7, 30, 60, 90]
+
+
+def windows(custom=0):
+    """STANDARD_WINDOWS plus a user-defined window (ignored if 0 or already standard)"""
+    custom = int(custom or 0)
+    return STANDARD_WINDOWS + ([custom] if custom > 0 and custom not in STANDARD_WINDOWS else [])
+
+
+def rolling_means(values, windows):
+    """{window: trailing mean of values over up to window rows} for each window"""
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.concatenate([[0.0], np.cumsum(np.where(present, values, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(present)])
+    ends = np.arange(1, len(values) + 1)
+    means = {}
+    for window in windows:
+        starts = np.maximum(ends - window, 0)
+        n = counts[ends] - counts[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[window] = np.where(n > 0, (sums[ends] - sums[starts]) / np.maximum(n, 1), np.nan)
+    return means
+
+
+def add_moving_averages(df, columns, windows):
+    """Add a '<name>_MA_<window>' column for each column -> name in columns and each window"""
+    for column, name in columns.items():
+        for window, mean in rolling_means(df[column].to_numpy(), windows).items():
+            df[f'{name}_MA_{window}'] = mean
+    return df
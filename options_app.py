@@ -0,0 +1,1052 @@
+"""Shared page for the TMF conversion apps (portfolio.py, tlt_tmf.py).
+
+Both apps render the same page: the sidebar (profiler, market data freshness), the
+TMF and ETF holdings, and the sections below them, each an st.fragment (see
+sections.py). They differ only in the projections at the bottom: portfolio.py
+adds projected returns and a Monte Carlo projection, tlt_tmf.py shows the
+contracts and shares per strategy. Each app is a call to run().
+
+Values every section needs from above the fragments (quotes, holdings, exposures,
+the risk-free rate and the rerun profiler) are passed to them as one page dict; a
+fragment rerunning on its own gets the dict from the last full run.
+"""
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import backtest
+import call_picker
+import greeks
+import market_data
+import monte_carlo
+import profiler
+import sections
+import tmf_core
+
+PAGE_TITLE = "TMF to ETF Call Converter"
+
+# Range of the sell call strike offset sliders (%)
+PERCENT_MIN = -50.0
+PERCENT_MAX = 50.0
+
+
+def sidebar(app):
+    """Profiler and market data controls; returns (rerun profiler, price freshness window, risk-free rate)"""
+    # --- Rerun profiler (opt-in): per-section and per-fetch timings, or one cProfile capture ---
+    with st.sidebar:
+        profile_reruns = st.checkbox("⏱️ Profile reruns", value=False, key="profile_reruns", help="Time each section and market data fetch on every rerun and append them to {}".format(profiler.DEFAULT_TRACE_PATH))
+        capture_cprofile = st.button("🔬 Capture cProfile of one rerun", key="capture_cprofile")
+    rerun_profiler = profiler.RerunProfiler(app, enabled=profile_reruns, capture_cprofile=capture_cprofile)
+
+    # --- Market data freshness (price cache is shared by every session of both apps) ---
+    with st.sidebar:
+        st.markdown("**Market Data**")
+        replay = market_data.replay_snapshot()
+        if replay is not None:
+            st.caption(f"⏪ Replaying snapshot `{replay.path}` (recorded {replay.recorded_at:%Y-%m-%d %H:%M} UTC); no live data is fetched.")
+        price_max_age = st.slider(
+            "Price freshness window (seconds)",
+            min_value=10,
+            max_value=3600,
+            value=market_data.DEFAULT_PRICE_TTL,
+            step=10,
+            key="price_max_age"
+        )
+        if st.button("🔄 Refresh market data now", key="refresh_prices"):
+            market_data.clear_price_cache()
+            market_data.clear_option_cache()
+            greeks.clear_greeks_cache()
+            call_picker.clear_picker_cache()
+        risk_free_rate = st.number_input(
+            "Risk-free rate for greeks (%)",
+            min_value=0.0,
+            max_value=20.0,
+            value=greeks.DEFAULT_RISK_FREE_RATE * 100,
+            step=0.05,
+            format="%.2f",
+            key="risk_free_rate"
+        ) / 100
+    return rerun_profiler, price_max_age, risk_free_rate
+
+
+def get_default_ticker(i):
+    return "TLT" if i == 0 else ("EDV" if i == 1 else "")
+
+
+def holdings(rerun_profiler, price_max_age, risk_free_rate):
+    """Quotes, holdings inputs and exposures; returns the page dict passed to every section"""
+    rerun_profiler.begin("TMF and holding quotes")
+    # --- Fetch TMF and every holding's price in one batched request ---
+    # Holdings are read from the widget state of the previous run so TMF (needed for the
+    # ETF value sliders below) and the ETFs share a single round trip.
+    holding_tickers = [
+        str(st.session_state.get(f"etf_ticker_{i}", get_default_ticker(i))).upper()
+        for i in range(int(st.session_state.get("num_etfs", 2)))
+    ]
+    quotes = market_data.get_spot_prices(["TMF"] + holding_tickers, max_age=price_max_age)
+    tmf_price = quotes.get("TMF")
+    if tmf_price is None:
+        st.error("Failed to fetch TMF price. Try again later.")
+        st.stop()
+
+    rerun_profiler.begin("Holdings inputs")
+    # --- Input: TMF holdings ---
+    tmf_shares = st.number_input("📊 How many TMF shares do you hold?", min_value=1, value=7270, step=10)
+
+    # --- Input: Dynamic ETF tickers, values, and multiples ---
+    st.markdown("---")
+    with st.expander("📋 Enter Your Existing ETF Holdings (can add multiple)", expanded=False):
+        st.subheader("📋 Enter Your Existing ETF Holdings (can add multiple)")
+
+        def get_default_multiple(ticker):
+            if ticker == "TLT":
+                return 2.2
+            elif ticker == "EDV":
+                return 1.5
+            else:
+                return 1.3
+
+        num_etfs = st.number_input("How many different ETF tickers do you own?", min_value=1, value=2, step=1, key="num_etfs")
+        etf_tickers = []
+        etf_values = []
+        etf_prices = []
+        etf_multiples = []
+
+        for i in range(int(num_etfs)):
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                default_ticker = get_default_ticker(i)
+                ticker = st.text_input(f"ETF ticker #{i+1}", value=default_ticker, key=f"etf_ticker_{i}").upper()
+            with col2:
+                value = st.slider(
+                    f"Total current value of {ticker} ($)",
+                    min_value=0,
+                    max_value=int(tmf_shares * tmf_price),
+                    value=0,
+                    step=100,
+                    format="%d",
+                    key=f"etf_value_{i}"
+                )
+            with col3:
+                default_multiple = get_default_multiple(ticker)
+                multiple = st.number_input(f"Multiple for {ticker} (vs TMF)", min_value=0.1, value=default_multiple, step=0.1, format="%.2f", key=f"etf_multiple_{i}")
+            etf_tickers.append(ticker)
+            etf_values.append(value)
+            etf_multiples.append(multiple)
+
+        # Tickers typed during this run that were not in the batch above (normally none)
+        new_tickers = [ticker for ticker in etf_tickers if ticker not in quotes]
+        if new_tickers:
+            quotes.update(market_data.get_spot_prices(new_tickers, max_age=price_max_age))
+        failed_tickers = [ticker for ticker in etf_tickers if ticker and quotes.get(ticker) is None]
+        if failed_tickers:
+            st.warning(f"Could not fetch a price for {', '.join(failed_tickers)}; treating it as $0 until data is available.")
+        for ticker in etf_tickers:
+            etf_prices.append(quotes.get(ticker) or 0.0)
+
+    rerun_profiler.begin("Exposures")
+    # --- Calculate exposures and show table ---
+    exposure_df = pd.DataFrame(tmf_core.compute_exposures(tmf_shares, tmf_price, etf_tickers, etf_values, etf_prices, etf_multiples))
+    # Calls are sized against the last holding's remaining exposure
+    net_needed_exposure = exposure_df['Net Exposure Needed'].iloc[-1]
+    return {
+        'profiler': rerun_profiler, 'risk_free_rate': risk_free_rate,
+        'tmf_price': tmf_price, 'tmf_shares': tmf_shares,
+        'etf_tickers': etf_tickers, 'etf_prices': etf_prices,
+        'exposure_df': exposure_df, 'net_needed_exposure': net_needed_exposure
+    }
+
+
+# Helper to get call details (automatic/manual)
+def get_call_details(option_etf, option_etf_price, entry_mode, slider_key, call_key, expiry_key, target_price, on_change=None, window=call_picker.DEFAULT_WINDOW, rate=greeks.DEFAULT_RISK_FREE_RATE):
+    if entry_mode == "Automatic (yfinance data)":
+        expirations = market_data.get_expirations(option_etf)
+        if not expirations:
+            st.error(f"No options data found for {option_etf}.")
+            st.stop()
+        # For sell call section, select default expiry at least 30 days out
+        default_expiry_idx = market_data.default_expiry_index(expirations)
+        expiry = st.selectbox(f"Choose Expiration Date for {option_etf}", expirations, key=expiry_key, index=default_expiry_idx, on_change=on_change)
+        calls = market_data.get_option_chain(option_etf, expiry)
+        if calls.empty:
+            st.error(f"No call options found for {option_etf} on {expiry}.")
+            st.stop()
+        # Only the strikes around the target, starting on the nearest one; labels are built once per chain
+        picker = call_picker.get_chain_picker(option_etf, expiry)
+        window_positions, nearest_index = call_picker.strike_window(picker, target_price, window)
+        selected_call_index = st.selectbox(
+            f"Choose {option_etf} Call Contract ({len(window_positions)} of {len(calls)} strikes around ${target_price:.2f}):",
+            window_positions,
+            format_func=lambda x: picker['labels'][x],
+            key=call_key,
+            index=nearest_index,
+            on_change=on_change
+        )
+        if selected_call_index is not None:
+            selected_call = calls.iloc[selected_call_index]
+            strike = selected_call.strike
+            premium = selected_call.bid
+            # Black-Scholes greeks from the chain's implied volatility, computed for the whole chain at once
+            call_greeks = greeks.get_chain_greeks(option_etf, expiry, option_etf_price, rate=rate).iloc[selected_call_index]
+            delta = call_greeks['delta']
+            if delta is None or math.isnan(delta):
+                delta = st.number_input(f"⚠️ Delta not available for {option_etf}. Enter manually:", min_value=0.1, max_value=1.0, value=0.9, key=f"delta_{call_key}", on_change=on_change)
+                st.warning("No usable implied volatility for this contract, please enter delta manually.")
+            else:
+                st.caption(f"Delta: {delta:.3f} | Gamma: {call_greeks['gamma']:.4f} | Theta/day: ${call_greeks['theta']:.3f} | Vega/1%: ${call_greeks['vega']:.3f} (IV {selected_call['impliedVolatility']:.1%})")
+            return strike, premium, delta
+        else:
+            return None, None, None
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Set manual defaults for TLT and EDV
+            if option_etf == "TLT":
+                manual_strike_default = 70.0
+                manual_bid_default = 16.45
+            elif option_etf == "EDV":
+                manual_strike_default = 56.0
+                manual_bid_default = 8.7
+            else:
+                manual_strike_default = None
+                manual_bid_default = None
+            manual_strike = st.number_input(
+                f"Strike Price ($) for {option_etf}:",
+                min_value=0.01,
+                value=manual_strike_default,
+                step=0.01,
+                format="%.2f",
+                key=f"strike_{call_key}",
+                on_change=on_change
+            )
+            manual_bid = st.number_input(f"Bid Price ($) for {option_etf}:", min_value=0.0, value=manual_bid_default, step=0.01, format="%.2f", key=f"bid_{call_key}", on_change=on_change)
+        with col2:
+            manual_delta = st.number_input(f"Delta for {option_etf}:", min_value=0.1, max_value=1.0, value=0.9, step=0.01, format="%.2f", key=f"delta_{call_key}", on_change=on_change)
+        return manual_strike, manual_bid, manual_delta
+
+
+def profiled(key):
+    """Run a fragment with page['profiler'] swapped for the profiler of the rerun it is part of"""
+    def decorate(fragment):
+        @functools.wraps(fragment)
+        def run_profiled(page, *args):
+            with page['profiler'].fragment_rerun(key) as rerun_profiler:
+                return fragment(dict(page, profiler=rerun_profiler), *args)
+        return run_profiled
+    return decorate
+
+
+@st.fragment(key=sections.COMPARISON_CALLS)
+@profiled(sections.COMPARISON_CALLS)
+def comparison_calls_section(page):
+    rerun_profiler, etf_tickers, etf_prices = page['profiler'], page['etf_tickers'], page['etf_prices']
+    net_needed_exposure = page['net_needed_exposure']
+    # Inputs that can change the chosen calls (the target sliders move the strike window) also rerun the sections using them
+    on_comparison_change = sections.rerun_from(sections.COMPARISON_CALLS)
+
+    rerun_profiler.begin("Call inputs")
+    # --- Option chain selection for remaining exposure ---
+    st.markdown("---")
+    st.subheader("🧩 Select ETF Call Options for Comparison")
+
+    # Add a 'multiple' input
+    multiple = st.number_input(
+        'Multiple (ETF 2 compared to ETF 1):',
+        min_value=0.01, value=1.3, step=0.01, format="%.2f",
+        on_change=on_comparison_change
+    )
+    strike_window = st.number_input(
+        "Strikes shown on each side of the target",
+        min_value=1, max_value=200, value=call_picker.DEFAULT_WINDOW, step=1,
+        key="strike_window",
+        on_change=on_comparison_change
+    )
+
+    col_left, col_gap, col_right = st.columns([3, 1, 3])
+
+    with col_left:
+        st.markdown("**Left: Select Call for ETF 1**")
+        option_etf1 = st.selectbox("Choose ETF 1 for call option", etf_tickers, key="option_etf1", on_change=on_comparison_change)
+        option_etf1_price = etf_prices[etf_tickers.index(option_etf1)]
+        percent_slider1 = st.slider(
+            f"Select ±% from current price for {option_etf1} (to visualize target strike):",
+            min_value=-75.0, max_value=75.0, value=-10.0, step=0.1, format="%.2f",
+            key="slider1",
+            on_change=on_comparison_change
+        )
+        target_price1 = option_etf1_price * (1 + percent_slider1 / 100)
+        st.info(f"Target price: ${target_price1:.2f}")
+        entry_mode1_default = 1 if option_etf1 == "TLT" else 0
+        entry_mode1 = st.radio("Choose entry mode for ETF 1:", ["Automatic (yfinance data)", "Manual entry"], key="entry_mode1", index=entry_mode1_default, on_change=on_comparison_change)
+
+    with col_right:
+        st.markdown("**Right: Select Call for ETF 2**")
+        option_etf2 = st.selectbox("Choose ETF 2 for call option", etf_tickers, key="option_etf2", index=etf_tickers.index("EDV") if "EDV" in etf_tickers else 0, on_change=on_comparison_change)
+        option_etf2_price = etf_prices[etf_tickers.index(option_etf2)]
+        percent_slider2_val = tmf_core.linked_offset(percent_slider1, multiple, -75.0, 75.0)
+        percent_slider2 = st.slider(
+            f"Select ±% from current price for {option_etf2} (auto-adjusted by multiple):",
+            min_value=-75.0, max_value=75.0, value=percent_slider2_val, step=0.1, format="%.2f",
+            key="slider2",
+            disabled=True
+        )
+        target_price2 = option_etf2_price * (1 + percent_slider2 / 100)
+        st.info(f"Target price: ${target_price2:.2f}")
+        entry_mode2 = st.radio("Choose entry mode for ETF 2:", ["Automatic (yfinance data)", "Manual entry"], key="entry_mode2", index=1, on_change=on_comparison_change)
+
+    rerun_profiler.begin("Chain prefetch")
+    # --- Prefetch every expiry list and call chain this run needs, in parallel ---
+    # Expiries come from the previous run's selectboxes (or the defaults they start with),
+    # so the sections below are served from the cache instead of fetching one by one.
+    chain_etfs = [etf for etf in dict.fromkeys([option_etf1, option_etf2, 'TLT', 'EDV']) if etf and etf in etf_tickers]
+    expirations_by_etf = market_data.prefetch_expirations(chain_etfs)
+
+    def previous_or_default_expiry(etf, state_key, first_expiry=False):
+        expirations = expirations_by_etf.get(etf)
+        if not expirations:
+            return None
+        selected = st.session_state.get(state_key)
+        if selected in expirations:
+            return etf, selected
+        return etf, expirations[0 if first_expiry else market_data.default_expiry_index(expirations)]
+
+    chain_requests = []
+    for etf, entry_mode, expiry_key in [(option_etf1, entry_mode1, "expiry1"), (option_etf2, entry_mode2, "expiry2")]:
+        if entry_mode == "Automatic (yfinance data)":
+            chain_requests.append(previous_or_default_expiry(etf, expiry_key))
+    for etf in ['TLT', 'EDV']:
+        chain_requests.append(previous_or_default_expiry(etf, f"sell_expiry_{etf}"))
+    for etf in [option_etf1, option_etf2]:
+        chain_requests.append(previous_or_default_expiry(etf, f"short_expiry_{etf}", first_expiry=True))
+    market_data.prefetch_option_chains([request for request in chain_requests if request is not None])
+
+    rerun_profiler.begin("Call details")
+    # Get call details for both ETFs
+    with col_left:
+        strike1, bid1, delta1 = get_call_details(option_etf1, option_etf1_price, entry_mode1, "slider1", "call1", "expiry1", target_price1, on_change=on_comparison_change, window=int(strike_window), rate=page['risk_free_rate'])
+    with col_right:
+        strike2, bid2, delta2 = get_call_details(option_etf2, option_etf2_price, entry_mode2, "slider2", "call2", "expiry2", target_price2, on_change=on_comparison_change, window=int(strike_window), rate=page['risk_free_rate'])
+
+    # Calculate per-contract exposure and contracts needed for both
+    contract_exposure1, contracts_needed1, total_premium_cost1 = tmf_core.size_contracts(net_needed_exposure, option_etf1_price, delta1, bid1)
+    contract_exposure2, contracts_needed2, total_premium_cost2 = tmf_core.size_contracts(net_needed_exposure, option_etf2_price, delta2, bid2)
+    sections.publish(sections.COMPARISON_CALLS, {
+        'option_etf1': option_etf1, 'option_etf1_price': option_etf1_price, 'strike1': strike1, 'bid1': bid1,
+        'option_etf2': option_etf2, 'option_etf2_price': option_etf2_price, 'strike2': strike2, 'bid2': bid2,
+        'contract_exposure1': contract_exposure1, 'contracts_needed1': contracts_needed1, 'total_premium_cost1': total_premium_cost1,
+        'contract_exposure2': contract_exposure2, 'contracts_needed2': contracts_needed2, 'total_premium_cost2': total_premium_cost2
+    })
+
+
+@st.fragment(key=sections.SELL_CALLS)
+@profiled(sections.SELL_CALLS)
+def sell_calls_section(page):
+    rerun_profiler, etf_tickers, etf_prices = page['profiler'], page['etf_tickers'], page['etf_prices']
+    on_sell_change = sections.rerun_from(sections.SELL_CALLS)
+
+    rerun_profiler.begin("Sell calls")
+    st.markdown("---")
+    st.subheader("📉 Sell Calls (TLT & EDV)")
+    col_sell_left, col_sell_gap, col_sell_right = st.columns([3, 1, 3])
+
+    # Dividend yield user input
+    col_div1, col_div2 = st.columns(2)
+    with col_div1:
+        tlt_yield = st.number_input("TLT Dividend Yield (%)", min_value=0.0, max_value=20.0, value=3.9, step=0.01, format="%.2f", key="tlt_div_yield", on_change=on_sell_change)
+    with col_div2:
+        edv_yield = st.number_input("EDV Dividend Yield (%)", min_value=0.0, max_value=20.0, value=4.9, step=0.01, format="%.2f", key="edv_div_yield", on_change=on_sell_change)
+    yield_dict = {'TLT': tlt_yield, 'EDV': edv_yield}
+
+    # User input for multiple
+    st.markdown("**Strike Offset Multiple (EDV vs TLT):**")
+    strike_multiple = st.number_input("Multiple (EDV offset = TLT offset × multiple)", min_value=0.01, value=1.3, step=0.01, format="%.2f", key="sell_strike_multiple", on_change=on_sell_change)
+
+    percent_default = 5.0
+
+    # (strike, bid) of the call picked below for each ETF, and how many times a year its
+    # expiry lets it be re-sold; reused by the strategy and premium tables
+    sold_calls = {}
+    sell_call_rolls = {}
+
+    with col_sell_left:
+        st.markdown("**TLT Call to Sell**")
+        tlt_price = etf_prices[etf_tickers.index('TLT')] if 'TLT' in etf_tickers else 0
+        tlt_offset = st.slider(
+            f"Select TLT strike as % from current price:",
+            min_value=PERCENT_MIN,
+            max_value=PERCENT_MAX,
+            value=percent_default,
+            step=0.1,
+            format="%.1f%%",
+            key="sell_strike_percent_TLT",
+            on_change=on_sell_change
+        )
+        # --- TLT Sell Call Option Selection ---
+        if 'TLT' in etf_tickers:
+            expirations = market_data.get_expirations('TLT')
+            if expirations:
+                default_expiry_idx = market_data.default_expiry_index(expirations)
+                expiry = st.selectbox(f"Choose Expiration Date for TLT (Sell)", expirations, key="sell_expiry_TLT", index=default_expiry_idx, on_change=on_sell_change)
+                calls = market_data.get_option_chain('TLT', expiry)
+                if not calls.empty:
+                    selected_call = tmf_core.closest_call(calls, tlt_price, tlt_offset)
+                    st.info(f"Strike: ${selected_call['strike']:.2f} | Bid: ${selected_call['bid']:.2f} | Ask: ${selected_call['ask']:.2f} | Volume: {selected_call['volume']} | OI: {selected_call['openInterest']}")
+                    sold_calls['TLT'] = (selected_call['strike'], selected_call['bid'])
+                    sell_call_rolls['TLT'] = tmf_core.rolls_per_year(market_data.days_to_expiry(expiry))
+
+    with col_sell_right:
+        st.markdown("**EDV Call to Sell**")
+        edv_price = etf_prices[etf_tickers.index('EDV')] if 'EDV' in etf_tickers else 0
+        edv_offset = tmf_core.linked_offset(tlt_offset, strike_multiple, PERCENT_MIN, PERCENT_MAX)
+        st.markdown(f"EDV strike offset: {edv_offset:.2f}% (auto-calculated)")
+        # --- EDV Sell Call Option Selection ---
+        if 'EDV' in etf_tickers:
+            expirations = market_data.get_expirations('EDV')
+            if expirations:
+                default_expiry_idx = market_data.default_expiry_index(expirations)
+                expiry = st.selectbox(f"Choose Expiration Date for EDV (Sell)", expirations, key="sell_expiry_EDV", index=default_expiry_idx, on_change=on_sell_change)
+                calls = market_data.get_option_chain('EDV', expiry)
+                if not calls.empty:
+                    selected_call = tmf_core.closest_call(calls, edv_price, edv_offset)
+                    st.info(f"Strike: ${selected_call['strike']:.2f} | Bid: ${selected_call['bid']:.2f} | Ask: ${selected_call['ask']:.2f} | Volume: {selected_call['volume']} | OI: {selected_call['openInterest']}")
+                    sold_calls['EDV'] = (selected_call['strike'], selected_call['bid'])
+                    sell_call_rolls['EDV'] = tmf_core.rolls_per_year(market_data.days_to_expiry(expiry))
+    sections.publish(sections.SELL_CALLS, {
+        'yield_dict': yield_dict, 'strike_multiple': strike_multiple, 'sold_calls': sold_calls, 'sell_call_rolls': sell_call_rolls,
+        'tlt_price': tlt_price, 'tlt_offset': tlt_offset, 'edv_price': edv_price, 'edv_offset': edv_offset
+    })
+
+
+@st.fragment(key=sections.SAFE_SHORT_CALLS)
+@profiled(sections.SAFE_SHORT_CALLS)
+def safe_short_calls_section(page):
+    rerun_profiler, exposure_df = page['profiler'], page['exposure_df']
+    comparison = sections.latest(sections.COMPARISON_CALLS)
+    option_etf1, option_etf1_price, strike1, bid1 = (comparison[k] for k in ['option_etf1', 'option_etf1_price', 'strike1', 'bid1'])
+    option_etf2, option_etf2_price, strike2, bid2 = (comparison[k] for k in ['option_etf2', 'option_etf2_price', 'strike2', 'bid2'])
+    contract_exposure1, contracts_needed1, total_premium_cost1 = (comparison[k] for k in ['contract_exposure1', 'contracts_needed1', 'total_premium_cost1'])
+    contract_exposure2, contracts_needed2, total_premium_cost2 = (comparison[k] for k in ['contract_exposure2', 'contracts_needed2', 'total_premium_cost2'])
+
+    rerun_profiler.begin("Combined table")
+    # Show comparison table
+    comparison_df = pd.DataFrame({
+        'ETF': [option_etf1, option_etf2],
+        # 'Strike': [strike1, strike2],
+        # 'Bid Premium': [bid1, bid2],
+        # 'Delta': [delta1, delta2],
+        'Per-Contract Exposure': [contract_exposure1, contract_exposure2],
+        'Contracts Needed': [contracts_needed1, contracts_needed2],
+        'Total Premium Cost': [total_premium_cost1, total_premium_cost2]
+    })
+
+    # Merge ETF exposure and comparison table, rounding contracts up (dollar columns are formatted when the table is shown)
+    merged_df = tmf_core.combine_exposures(exposure_df, comparison_df)
+
+    rerun_profiler.begin("Safe short calls")
+    # --- Safe Short Call Contracts Section ---
+    st.markdown("---")
+    with st.expander("🛡️ Safe Short Call Contracts to Sell", expanded=False):
+        st.subheader("🛡️ Safe Short Call Contracts to Sell")
+
+        # Show safe short calls for each selected ETF
+        for etf_idx, (etf, strike, bid, current_price) in enumerate([(option_etf1, strike1, bid1, option_etf1_price), (option_etf2, strike2, bid2, option_etf2_price)]):
+            if strike is not None and bid is not None:
+                st.markdown(f"### {etf} Safe Short Call Analysis")
+                
+                # Get available expirations for short calls
+                try:
+                    expirations = market_data.get_expirations(etf)
+                    if expirations:
+                        # Select expiry for short calls (default to first available)
+                        short_expiry = st.selectbox(
+                            f"Select expiry for {etf} short calls:",
+                            options=expirations,
+                            key=f"short_expiry_{etf}",
+                            index=0
+                        )
+                        
+                        if short_expiry:
+                            # Get option chain for selected expiry
+                            calls = market_data.get_option_chain(etf, short_expiry)
+                            
+                            if not calls.empty:
+                                # Calculate DTE
+                                dte = market_data.days_to_expiry(short_expiry)
+                                
+                                # Safe calls (positive break-even below the strike), by rising margin
+                                safe_calls = tmf_core.safe_short_calls(calls, strike, bid)
+                                
+                                if not safe_calls.empty:
+                                    # Display safe calls table
+                                    st.markdown(f"#### Safe Short Calls for {etf} ({dte} DTE)")
+                                    st.info(f"**Safe Price Formula:** Strike (${strike:.2f}) + Premium Paid (${bid:.2f}) - Premium Received from Short Call")
+                                    display_cols = ['strike', 'bid', 'ask', 'safe_price', 'margin']
+                                    available_cols = [col for col in display_cols if col in safe_calls.columns]
+                                    st.dataframe(
+                                        safe_calls[available_cols],
+                                        use_container_width=True
+                                    )
+                                else:
+                                    st.warning(f"No safe short call options found for {etf} on {short_expiry}. All options would result in negative margins.")
+                            else:
+                                st.warning(f"No call options available for {etf} on {short_expiry}")
+                        else:
+                            st.info(f"Please select an expiry for {etf} short calls")
+                    else:
+                        st.warning(f"No option expirations available for {etf}")
+                except Exception as e:
+                    st.error(f"Error loading options for {etf}: {e}")
+
+        # --- Cross-expiry scan: every expiry x strike for both ETFs, ranked by annualized premium yield ---
+        st.markdown("### Cross-Expiry Safe Short Call Scan")
+        if st.checkbox("Scan every expiry (fetches all chains in parallel)", value=False, key="scan_all_expiries"):
+            scan_positions = {
+                etf: (strike, bid, current_price)
+                for etf, strike, bid, current_price in [(option_etf2, strike2, bid2, option_etf2_price), (option_etf1, strike1, bid1, option_etf1_price)]
+                if strike is not None and bid is not None
+            }
+            scan_expirations = market_data.prefetch_expirations(list(scan_positions))
+            scan_chains = market_data.prefetch_option_chains([
+                (etf, expiry) for etf, expirations in scan_expirations.items() for expiry in expirations
+            ])
+            scan_df = tmf_core.scan_short_calls(scan_chains, scan_positions)
+            if not scan_df.empty:
+                st.caption(f"{len(scan_df):,} safe contracts across {len(scan_chains)} chains; annualized yield = bid / spot × 365 / DTE")
+                st.dataframe(
+                    tmf_core.format_table(
+                        scan_df,
+                        price=['strike', 'bid', 'ask', 'safe_price', 'margin'],
+                        percent=['premium_yield_pct', 'annualized_yield_pct']
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.warning("No safe short calls found in any expiry.")
+
+    st.markdown("---")
+    with st.expander("📊 Final Combined Table", expanded=False):
+        st.subheader("📊 Final Combined Table")
+        st.dataframe(
+            tmf_core.format_table(merged_df, money=['Current Exposure', 'Net Exposure Needed', 'Total Premium Cost', 'Total Exposure', 'Per-Contract Exposure']),
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+@st.fragment(key=sections.STRATEGIES)
+@profiled(sections.STRATEGIES)
+def strategies_section(page):
+    rerun_profiler, etf_tickers, etf_prices = page['profiler'], page['etf_tickers'], page['etf_prices']
+    tmf_price, tmf_shares, risk_free_rate = page['tmf_price'], page['tmf_shares'], page['risk_free_rate']
+    on_strategy_change = sections.rerun_from(sections.STRATEGIES)
+    comparison = sections.latest(sections.COMPARISON_CALLS)
+    option_etf1, strike1, bid1 = (comparison[k] for k in ['option_etf1', 'strike1', 'bid1'])
+    option_etf2, strike2, bid2 = (comparison[k] for k in ['option_etf2', 'strike2', 'bid2'])
+    sell = sections.latest(sections.SELL_CALLS)
+    yield_dict, strike_multiple, sold_calls, sell_call_rolls, tlt_offset = (sell[k] for k in ['yield_dict', 'strike_multiple', 'sold_calls', 'sell_call_rolls', 'tlt_offset'])
+
+    rerun_profiler.begin("Strategy allocation")
+    # --- New: Multiple Strategy Capital Allocation and Contract Summary for TLT and EDV ---
+    strategies_df = pd.DataFrame()
+    strategy_summary_df = pd.DataFrame()
+    strategy_prices = {}
+    if set(['TLT', 'EDV']).issubset(set(etf_tickers)):
+        st.markdown("---")
+        st.subheader("📊 Multiple Strategy Capital Allocation (TLT & EDV)")
+        total_capital = tmf_shares * tmf_price
+        
+        # Strategy management
+        num_strategies = st.number_input("Number of strategies to compare:", min_value=1, max_value=5, value=2, step=1, on_change=on_strategy_change)
+        
+        strategy_prices = {etf: etf_prices[etf_tickers.index(etf)] for etf in tmf_core.STRATEGY_ETFS}
+        # Use the selected call contract from the call options section (ETF 1's if both are the same ETF)
+        contract_costs = {}
+        for etf, bid in [(option_etf2, bid2), (option_etf1, bid1)]:
+            contract_costs[etf] = bid * 100 if bid is not None else 0.0
+        all_strategies_data = []
+        
+        for strategy_num in range(int(num_strategies)):
+            st.markdown(f"---")
+            st.markdown(f"**Strategy {strategy_num + 1}**")
+            
+            # Create flexible capital allocation inputs for this strategy
+            col_alloc1, col_alloc2 = st.columns(2)
+            
+            with col_alloc1:
+                st.markdown("**TLT Allocation**")
+                tlt_shares_pct = st.number_input(
+                    f"TLT Shares (%) - Strategy {strategy_num + 1}",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=0.0 if strategy_num == 0 else 50.0,
+                    step=1.0,
+                    format="%.0f",
+                    key=f"tlt_shares_pct_{strategy_num}",
+                    on_change=on_strategy_change
+                )
+                tlt_calls_pct = st.number_input(
+                    f"TLT Calls (%) - Strategy {strategy_num + 1}",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=50.0 if strategy_num == 0 else 0.0,
+                    step=1.0,
+                    format="%.0f",
+                    key=f"tlt_calls_pct_{strategy_num}",
+                    on_change=on_strategy_change
+                )
+            
+            with col_alloc2:
+                st.markdown("**EDV Allocation**")
+                edv_shares_pct = st.number_input(
+                    f"EDV Shares (%) - Strategy {strategy_num + 1}",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=50.0 if strategy_num == 0 else 0.0,
+                    step=1.0,
+                    format="%.0f",
+                    key=f"edv_shares_pct_{strategy_num}",
+                    on_change=on_strategy_change
+                )
+                edv_calls_pct = st.number_input(
+                    f"EDV Calls (%) - Strategy {strategy_num + 1}",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=0.0 if strategy_num == 0 else 50.0,
+                    step=1.0,
+                    format="%.0f",
+                    key=f"edv_calls_pct_{strategy_num}",
+                    on_change=on_strategy_change
+                )
+            
+            # Calculate total allocated percentage for this strategy
+            total_allocated = tlt_shares_pct + tlt_calls_pct + edv_shares_pct + edv_calls_pct
+            remaining_pct = 100.0 - total_allocated
+            
+            if total_allocated > 100.0:
+                st.error(f"⚠️ Strategy {strategy_num + 1}: Total allocation exceeds 100% ({total_allocated:.1f}%). Please reduce allocations.")
+            else:
+                st.info(f"📊 Strategy {strategy_num + 1}: Total allocated: {total_allocated:.1f}% | Remaining: {remaining_pct:.1f}%")
+            
+            all_strategies_data.extend(tmf_core.allocate_strategy(
+                f"Strategy {strategy_num + 1}",
+                total_capital,
+                {'TLT': (tlt_shares_pct, tlt_calls_pct), 'EDV': (edv_shares_pct, edv_calls_pct)},
+                strategy_prices,
+                contract_costs
+            ))
+        
+        # Numeric per-ETF rows and per-strategy totals; formatted only when displayed
+        strategies_df = pd.DataFrame(all_strategies_data)
+        strategy_summary_df = tmf_core.summarize_strategies(strategies_df)
+
+        # --- Optimizer mode: sweep every shares/calls split on a grid in one vectorized pass ---
+        with st.expander("🔍 Allocation Optimizer (TLT & EDV)", expanded=False):
+            st.caption("Evaluates every TLT/EDV shares-vs-calls split on a grid (at most 100% allocated) with the selected buy and sell calls, and keeps the splits no other split beats on both TLT-equivalent exposure and annual income.")
+            optimizer_enabled = st.checkbox("Run optimizer", value=False, key="optimizer_enabled")
+            grid_step = st.select_slider("Grid step (%)", options=[20.0, 10.0, 5.0, 2.5], value=5.0, key="optimizer_grid_step")
+            if optimizer_enabled:
+                sold_bids = {etf: bid for etf, (strike, bid) in sold_calls.items()}
+
+                def optimize():
+                    grid_results_df = tmf_core.evaluate_allocations(
+                        tmf_core.allocation_grid(grid_step),
+                        total_capital,
+                        strategy_prices,
+                        contract_costs,
+                        sold_bids,
+                        yield_dict,
+                        rolls=sell_call_rolls
+                    )
+                    return tmf_core.pareto_frontier(grid_results_df), len(grid_results_df)
+
+                # Reused until an input changes, so toggling other sections costs nothing here
+                frontier_df, grid_size = sections.memo(
+                    'optimizer',
+                    (grid_step, total_capital, strategy_prices, contract_costs, sold_bids, yield_dict, sell_call_rolls),
+                    optimize
+                )
+                st.markdown(f"**Pareto frontier:** {len(frontier_df)} of {grid_size:,} splits")
+                st.dataframe(
+                    tmf_core.format_table(
+                        frontier_df,
+                        money=['Total Capital Used', 'Total Capital Controlled', 'Total TLT Equivalent Capital', 'Total Annual Income'],
+                        percent=['Annual Return (%)'],
+                        whole_percent=['TLT Shares (%)', 'TLT Calls (%)', 'EDV Shares (%)', 'EDV Calls (%)']
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+        # --- Historical backtest: replay each strategy (or an offset sweep) with monthly rolls ---
+        with st.expander("📜 Historical Backtest (TLT & EDV)", expanded=False):
+            st.caption("Replays each strategy's split over daily history, selling calls every month at the TLT/EDV strike offsets above and rebalancing at each roll. Option prices come from Black-Scholes on trailing realized volatility; long calls keep the selected call's moneyness and time to expiry.")
+            backtest_enabled = st.checkbox("Run backtest", value=False, key="backtest_enabled")
+            col_bt_period, col_bt_sweep = st.columns(2)
+            with col_bt_period:
+                backtest_period = st.selectbox("History", ["1y", "2y", "5y", "10y", "max"], index=2, key="backtest_period")
+            with col_bt_sweep:
+                backtest_sweep = st.checkbox("Also sweep TLT offsets from -10% to +20%", value=False, key="backtest_sweep_offsets")
+            if backtest_enabled:
+                long_moneyness = {}
+                long_days = {}
+                for etf, strike, expiry_key in [(option_etf2, strike2, "expiry2"), (option_etf1, strike1, "expiry1")]:
+                    if strike is not None and strategy_prices.get(etf):
+                        long_moneyness[etf] = strike / strategy_prices[etf]
+                    if st.session_state.get(expiry_key):
+                        long_days[etf] = max(market_data.days_to_expiry(st.session_state[expiry_key]), 30)
+                backtest_rows = []
+                for strategy, group in strategies_df.groupby('Strategy', sort=False):
+                    allocation = group.set_index('ETF')
+                    row = {'Strategy': strategy}
+                    for etf in backtest.ETFS:
+                        row[f'{etf} Shares (%)'] = allocation.loc[etf, 'Shares Allocation (%)']
+                        row[f'{etf} Calls (%)'] = allocation.loc[etf, 'Calls Allocation (%)']
+                    offsets = [(strategy, tlt_offset)]
+                    if backtest_sweep:
+                        offsets += [(f"{strategy} @ {offset:+.1f}%", offset) for offset in np.arange(-10.0, 20.5, 2.5)]
+                    for label, offset in offsets:
+                        backtest_rows.append(dict(row, **{'Strategy': label, 'TLT Offset (%)': offset, 'EDV Offset (%)': max(PERCENT_MIN, min(PERCENT_MAX, offset * strike_multiple))}))
+                backtest_rows.append({'Strategy': 'Hold TLT', 'TLT Shares (%)': 100.0, 'TLT Calls (%)': 0.0, 'TLT Offset (%)': np.nan, 'EDV Shares (%)': 0.0, 'EDV Calls (%)': 0.0, 'EDV Offset (%)': np.nan})
+                backtest_history = market_data.get_price_history(backtest.ETFS, period=backtest_period).dropna()
+                if len(backtest_history) < 2 * backtest.ROLL_TRADING_DAYS:
+                    st.warning("Not enough TLT and EDV price history to run the backtest.")
+                else:
+                    backtest_params = pd.DataFrame(backtest_rows)
+
+                    def run_backtest():
+                        equity_df = backtest.run_backtests(
+                            backtest_history,
+                            backtest_params,
+                            long_moneyness,
+                            long_days,
+                            yield_dict,
+                            rate=risk_free_rate
+                        )
+                        backtest_summary_df = backtest.summarize_backtests(equity_df)
+                        backtest_summary_df['Sharpe Ratio'] = backtest_summary_df['Sharpe Ratio'].round(2)
+                        return equity_df, backtest_summary_df
+
+                    equity_df, backtest_summary_df = sections.memo(
+                        'backtest',
+                        (backtest_history, backtest_params, long_moneyness, long_days, yield_dict, risk_free_rate),
+                        run_backtest
+                    )
+                    st.dataframe(
+                        tmf_core.format_table(
+                            backtest_summary_df,
+                            percent=['Total Return (%)', 'Annualized Return (%)', 'Annualized Volatility (%)', 'Max Drawdown (%)']
+                        ),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    st.line_chart(equity_df[[name for name in equity_df.columns if '@' not in name]] * total_capital)
+                    st.caption(f"{len(equity_df) - 1} monthly rolls from {equity_df.index[0]:%Y-%m-%d} to {equity_df.index[-1]:%Y-%m-%d}; chart shows the value of the current capital invested at the start.")
+    sections.publish(sections.STRATEGIES, {
+        'strategies_df': strategies_df,
+        'strategy_summary_df': strategy_summary_df,
+        'strategy_prices': strategy_prices
+    })
+
+
+def projection_inputs(rerun_profiler):
+    """Expected upside, horizon and Monte Carlo settings (a dict)"""
+    rerun_profiler.begin("Projection inputs")
+    # --- User Input: Projected Upside and Time Horizon ---
+    st.markdown("---")
+    col_upside, col_time = st.columns(2)
+    with col_upside:
+        projected_upside_pct = st.number_input(
+            "🔼 Expected Upside (%)",
+            min_value=-500.0,  # Allow negative values
+            max_value=500.0,
+            value=10.0,
+            step=0.5,
+            format="%.2f"
+        )
+    with col_time:
+        projected_months = st.number_input(
+            "⏳ Time Horizon (months)",
+            min_value=1, max_value=60, value=12, step=1
+        )
+
+    # --- Monte Carlo settings for the projection ---
+    col_paths, col_vol, col_seed = st.columns(3)
+    with col_paths:
+        mc_paths = st.selectbox("🎲 Monte Carlo paths", [10_000, 100_000, 500_000, 1_000_000], index=1, format_func=lambda n: f"{n:,}")
+    with col_vol:
+        mc_vol_source = st.radio("Volatility source", ["History (2y)", "Option chains (ATM IV)"])
+    with col_seed:
+        mc_seed = st.number_input("Random seed", min_value=0, value=42, step=1)
+    return {
+        'upside_pct': projected_upside_pct, 'months': projected_months,
+        'paths': mc_paths, 'vol_source': mc_vol_source, 'seed': mc_seed
+    }
+
+
+def projected_results(page, combined_summary_df, projection):
+    """Projected returns and the Monte Carlo projection of each strategy (and holding TMF)"""
+    tmf_price, tmf_shares = page['tmf_price'], page['tmf_shares']
+    projected_upside_pct, projected_months = projection['upside_pct'], projection['months']
+    mc_paths, mc_vol_source, mc_seed = projection['paths'], projection['vol_source'], projection['seed']
+    comparison = sections.latest(sections.COMPARISON_CALLS)
+    option_etf1, strike1, bid1 = (comparison[k] for k in ['option_etf1', 'strike1', 'bid1'])
+    option_etf2, strike2, bid2 = (comparison[k] for k in ['option_etf2', 'strike2', 'bid2'])
+    sell = sections.latest(sections.SELL_CALLS)
+    yield_dict, sold_calls, sell_call_rolls = (sell[k] for k in ['yield_dict', 'sold_calls', 'sell_call_rolls'])
+    tlt_price, tlt_offset, edv_price, edv_offset = (sell[k] for k in ['tlt_price', 'tlt_offset', 'edv_price', 'edv_offset'])
+    strategies = sections.latest(sections.STRATEGIES)
+    strategies_df, strategy_summary_df, strategy_prices = (strategies[k] for k in ['strategies_df', 'strategy_summary_df', 'strategy_prices'])
+
+    # --- Projected Return Calculation ---
+    projected_df = tmf_core.projected_returns(combined_summary_df, projected_upside_pct, projected_months)
+    display_cols = ['Strategy', 'Total Contracts', 'Total Shares', 'Total Capital Used', 'Total TLT Equivalent Capital', 'Projected Return ($)', 'Annualized Return (%)']
+    st.markdown('#### Total Contracts and Shares by Strategy')
+    st.dataframe(
+        tmf_core.format_table(
+            projected_df[display_cols],
+            money=['Total Capital Used', 'Total TLT Equivalent Capital', 'Projected Return ($)'],
+            percent=['Annualized Return (%)']
+        ),
+        hide_index=True,
+        use_container_width=True
+    )
+
+    # --- Monte Carlo Projection ---
+    st.markdown('#### Monte Carlo Projection')
+    mc_history = market_data.get_price_history(monte_carlo.ASSETS, period="2y").dropna()
+    if len(mc_history) < 30:
+        st.warning("Not enough price history for TLT, EDV and TMF to run the Monte Carlo projection.")
+    else:
+        mc_vols, mc_corr, mc_betas = monte_carlo.estimate_parameters(mc_history)
+        if mc_vol_source == "Option chains (ATM IV)":
+            for etf, price in [('TLT', tlt_price), ('EDV', edv_price)]:
+                expiry = st.session_state.get(f"sell_expiry_{etf}")
+                implied_vol = monte_carlo.atm_implied_vol(market_data.get_option_chain(etf, expiry), price) if expiry else float('nan')
+                if implied_vol > 0:
+                    mc_vols[etf] = implied_vol
+        long_calls = {}
+        for etf, strike, bid in [(option_etf2, strike2, bid2), (option_etf1, strike1, bid1)]:
+            if strike is not None and bid is not None:
+                long_calls[etf] = (strike, bid)
+        mc_names, mc_positions = monte_carlo.build_positions(
+            strategies_df,
+            long_calls,
+            sold_calls,
+            {'TLT': tlt_offset, 'EDV': edv_offset},
+            strategy_prices,
+            yield_dict,
+            sell_call_rolls,
+            tmf_shares
+        )
+        mc_spots = {'TLT': tlt_price, 'EDV': edv_price, 'TMF': tmf_price}
+        mc_drifts = monte_carlo.drifts_from_upside(projected_upside_pct, projected_months, mc_betas)
+        mc_capital = list(strategy_summary_df['Total Capital Used']) + [tmf_shares * tmf_price]
+
+        def simulate():
+            mc_pnl = monte_carlo.simulate_pnl(
+                mc_spots,
+                mc_vols,
+                mc_corr,
+                mc_drifts,
+                mc_positions,
+                projected_months,
+                n_paths=mc_paths,
+                seed=int(mc_seed)
+            )
+            return monte_carlo.summarize_distribution(mc_pnl, mc_names, mc_capital, projected_months)
+
+        # Only the summary is kept, not the simulated paths
+        mc_summary_df = sections.memo(
+            'monte_carlo',
+            (mc_spots, mc_vols, mc_corr, mc_drifts, mc_positions, projected_months, mc_paths, int(mc_seed), mc_names, mc_capital),
+            simulate
+        )
+        st.dataframe(
+            tmf_core.format_table(mc_summary_df, percent=[col for col in mc_summary_df.columns if col != 'Strategy']),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption(
+            f"{mc_paths:,} correlated paths over {projected_months} months (seed {int(mc_seed)}); "
+            f"volatility TLT {mc_vols['TLT']:.1%}, EDV {mc_vols['EDV']:.1%}, TMF {mc_vols['TMF']:.1%}. "
+            "Returns are on each strategy's capital used; sold calls are re-sold monthly at the chosen offsets."
+        )
+
+
+@st.fragment(key=sections.PROJECTIONS)
+@profiled(sections.PROJECTIONS)
+def projections_section(page, monte_carlo_projection=False):
+    """Analysis results; with monte_carlo_projection, projected returns and a Monte Carlo projection of the strategies"""
+    rerun_profiler, etf_tickers = page['profiler'], page['etf_tickers']
+    sell = sections.latest(sections.SELL_CALLS)
+    yield_dict, sold_calls, sell_call_rolls = (sell[k] for k in ['yield_dict', 'sold_calls', 'sell_call_rolls'])
+    tlt_price, edv_price = sell['tlt_price'], sell['edv_price']
+    strategies = sections.latest(sections.STRATEGIES)
+    strategies_df, strategy_summary_df = strategies['strategies_df'], strategies['strategy_summary_df']
+
+    projection = projection_inputs(rerun_profiler) if monte_carlo_projection else None
+
+    # --- Calculate Button ---
+    st.markdown("---")
+    calculate_button = st.button("🚀 **START ANALYSIS**", type="primary", use_container_width=True)
+
+    rerun_profiler.begin("Results")
+    # --- Results Section (Full Width) ---
+    if calculate_button:
+        st.markdown("---")
+        st.markdown("## 📊 Analysis Results")
+        
+        # --- Strategy Comparison Tables (Hidden by default) ---
+        if not strategies_df.empty:
+            with st.expander("📊 Combined Strategy Comparison", expanded=False):
+                st.dataframe(
+                    tmf_core.format_table(
+                        strategies_df,
+                        money=['Capital for Shares', 'Capital for Calls', 'Total Capital Controlled', 'TLT Equivalent Capital'],
+                        whole_percent=['Shares Allocation (%)', 'Calls Allocation (%)']
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            
+            with st.expander("📊 Strategy Summary Comparison", expanded=False):
+                st.dataframe(
+                    tmf_core.format_table(
+                        strategy_summary_df,
+                        money=['Total Capital Used', 'Total Capital Controlled', 'Total TLT Equivalent Capital']
+                    ),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+        # --- Sell Calls Premium Table (Hidden by default) ---
+        if set(['TLT', 'EDV']).issubset(set(etf_tickers)):
+            with st.expander("📊 Sell Calls Premium Table", expanded=False):
+                sell_df = tmf_core.sell_call_income(
+                    strategies_df,
+                    strategy_summary_df,
+                    sold_calls,
+                    {'TLT': tlt_price, 'EDV': edv_price},
+                    yield_dict,
+                    rolls=sell_call_rolls
+                )
+                sell_summary_df = tmf_core.summarize_sell_calls(sell_df, strategy_summary_df)
+
+                # Create comprehensive sell calls table for all strategies
+                if not sell_df.empty:
+                    st.dataframe(
+                        tmf_core.format_table(
+                            sell_df,
+                            money=['Total Premium Collected', 'Annual Premium', 'Annual Dividend Income', 'Total Annual Income', 'Monthly Total Income'],
+                            price=['Strike Price', 'Bid Premium'],
+                            percent=['Annual Return (%)']
+                        ),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    
+                    # Display summary for each strategy
+                    with st.expander("📊 Strategy Sell Calls Summary", expanded=False):
+                        if not sell_summary_df.empty:
+                            st.dataframe(
+                                tmf_core.format_table(
+                                    sell_summary_df,
+                                    money=['Total Capital Used', 'Total Annual Income', 'Monthly Income'],
+                                    percent=['Annual Return (%)']
+                                ),
+                                hide_index=True,
+                                use_container_width=True
+                            )
+                        else:
+                            st.info("No sell calls data available for the configured strategies.")
+
+            # --- Combined Summary Section ---
+            if not strategies_df.empty:
+                st.markdown("---")
+                st.subheader("📊 Combined Strategy & Sell Calls Summary")
+                
+                combined_summary_df = tmf_core.combine_summaries(strategy_summary_df, sell_summary_df)
+
+                # Display combined summary table
+                if not combined_summary_df.empty:
+                    column_order = [
+                        'Strategy',
+                        'Total Capital Used',
+                        'Total Capital Controlled',
+                        'Total TLT Equivalent Capital',
+                        'Current TLT',
+                        'Annual Return (%)',
+                        'Total Annual Income',
+                        'Monthly Income'
+                    ]
+                    st.dataframe(
+                        tmf_core.format_table(
+                            combined_summary_df[column_order],
+                            money=['Total Capital Used', 'Total Capital Controlled', 'Total TLT Equivalent Capital', 'Current TLT', 'Total Annual Income', 'Monthly Income'],
+                            percent=['Annual Return (%)']
+                        ),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    if projection is not None:
+                        projected_results(page, combined_summary_df, projection)
+                    else:
+                        # Show a separate table for just total contracts and shares
+                        st.markdown('#### Total Contracts and Shares by Strategy')
+                        st.dataframe(combined_summary_df[['Strategy', 'Total Contracts', 'Total Shares']], hide_index=True, use_container_width=True)
+                else:
+                    st.info("No combined summary data available.")
+
+
+def cache_and_profile(rerun_profiler):
+    rerun_profiler.begin("Cache stats")
+    # --- Market data cache effectiveness (counters accumulate across all sessions) ---
+    with st.sidebar:
+        with st.expander("Cache stats", expanded=False):
+            for cache_name, stats in market_data.cache_stats().items():
+                st.caption(f"{cache_name}: {stats['hits']} hits / {stats['misses']} misses ({stats['size']}/{stats['maxsize']} entries)")
+
+    # --- Rerun profile: where this rerun's time went (only while profiling) ---
+    rerun_record = rerun_profiler.finish()
+    if rerun_record is not None:
+        with st.sidebar:
+            with st.expander("⏱️ Rerun profile", expanded=True):
+                st.caption(f"Total {rerun_record['total_ms']:,.0f} ms, appended to `{rerun_profiler.trace_path}`")
+                st.dataframe(pd.DataFrame(rerun_record['sections']).round(1), hide_index=True, use_container_width=True)
+                if rerun_record['fetches']:
+                    st.dataframe(pd.DataFrame(rerun_record['fetches']).round(1), hide_index=True, use_container_width=True)
+                else:
+                    st.caption("No upstream fetches: everything was served from the cache.")
+                st.caption(" | ".join(
+                    f"{name}: {rate:.0%} hits this rerun" for name, rate in rerun_record['cache_hit_rates'].items() if rate is not None
+                ))
+                if rerun_profiler.cprofile_text:
+                    st.caption(f"cProfile saved to `{rerun_profiler.cprofile_path}`")
+                    st.code(rerun_profiler.cprofile_text)
+
+
+def run(app, monte_carlo_projection=False):
+    """Render the page; app names the rerun trace records"""
+    st.set_page_config(page_title=PAGE_TITLE, layout="centered")
+    st.title("🔁 TMF Exposure via ETF Call Options")
+
+    rerun_profiler, price_max_age, risk_free_rate = sidebar(app)
+    try:
+        page = holdings(rerun_profiler, price_max_age, risk_free_rate)
+
+        # --- Sections below rerun on their own (st.fragment); an input reruns its section and the
+        # sections downstream of it (sections.DEPENDENTS) instead of the whole script ---
+        comparison_calls_section(page)
+        sell_calls_section(page)
+        safe_short_calls_section(page)
+        strategies_section(page)
+        projections_section(page, monte_carlo_projection)
+
+        cache_and_profile(rerun_profiler)
+    finally:
+        # st.stop() and interrupted reruns never reach finish()
+        rerun_profiler.close()
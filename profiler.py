@@ -0,0 +1,175 @@
+"""Opt-in rerun profiler for the Streamlit apps.
+
+A RerunProfiler is created at the top of every rerun. The script marks where each
+named section starts with begin(); the time until the next begin() (or finish())
+is attributed to it. Every upstream market data fetch made while the profiler is
+active is recorded too, with its duration and whether it joined a fetch already
+in flight. finish() returns the rerun's record and appends it, with the hit rates
+of the cache lookups made during the rerun, to a JSONL trace file.
+
+A rerun can end before finish(): st.stop(), an exception, or a newer rerun
+interrupting it. Apps call close() in a finally block to remove the fetch observer
+and stop cProfile whatever happens, and a new profiler also closes one left
+behind on its thread.
+
+Sections that rerun on their own (st.fragment) outlive the rerun that created the
+profiler; fragment_rerun() gives each such rerun a fresh profiler of its own,
+traced with the fragment's name.
+
+When disabled, every method is a no-op, so the apps can call them unconditionally.
+"""
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+import market_data
+
+DEFAULT_TRACE_PATH = os.environ.get('RERUN_TRACE_PATH', 'rerun_trace.jsonl')
+DEFAULT_PROFILE_DIR = os.environ.get('RERUN_PROFILE_DIR', 'profiles')
+PSTATS_LINES = 25
+
+# Reruns from every session append to the same trace file
+_trace_lock = threading.Lock()
+
+# The profiler whose hooks are installed on each (script runner) thread
+_active = threading.local()
+
+
+def _hit_rate(hits, misses):
+    lookups = hits + misses
+    return hits / lookups if lookups else None
+
+
+def _lookups():
+    """{cache name: (hits, misses)} so far, across all sessions"""
+    return {name: (stats['hits'], stats['misses']) for name, stats in market_data.cache_stats().items()}
+
+
+class RerunProfiler:
+    """Section and fetch timings for one rerun of an app"""
+
+    def __init__(self, app, enabled=False, capture_cprofile=False, trace_path=DEFAULT_TRACE_PATH, fragment=None):
+        self.app = app
+        self.fragment = fragment
+        self.profile_reruns = enabled
+        self.enabled = enabled or capture_cprofile
+        self.closed = False
+        self.trace_path = trace_path
+        self.sections = []
+        self.calls = []
+        self.cprofile_text = None
+        self.cprofile_path = None
+        self._current = None
+        self._started = time.perf_counter()
+        self._calls_lock = threading.Lock()
+        self._observing = None
+        self._cprofile = None
+        self._lookups_at_start = {}
+        leftover = getattr(_active, 'profiler', None)
+        if leftover is not None:
+            leftover.close()
+        if self.enabled:
+            _active.profiler = self
+            self._lookups_at_start = _lookups()
+            self._observing = market_data.observe_fetches(self._record_call)
+            self._observing.__enter__()
+        if capture_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _record_call(self, key, seconds, coalesced):
+        with self._calls_lock:
+            self.calls.append({
+                'fetch': ' '.join(str(part) for part in key),
+                'ms': seconds * 1000,
+                'coalesced': coalesced,
+                'section': self._current[0] if self._current else None
+            })
+
+    def _close_section(self):
+        if self._current is not None:
+            name, started = self._current
+            self.sections.append({'section': name, 'ms': (time.perf_counter() - started) * 1000})
+            self._current = None
+
+    def begin(self, name):
+        """End the running section and start timing the next one"""
+        if not self.enabled:
+            return
+        self._close_section()
+        self._current = (name, time.perf_counter())
+
+    def finish(self):
+        """Stop timing, write the trace record and return it (None when disabled)"""
+        if not self.enabled:
+            return None
+        self._close_section()
+        self.close()
+        if self._cprofile is not None:
+            self._save_cprofile()
+
+        # Hit rates of this rerun's lookups (other sessions' lookups in the meantime are counted too)
+        cache_hit_rates = {}
+        for name, (hits, misses) in _lookups().items():
+            hits_before, misses_before = self._lookups_at_start.get(name, (0, 0))
+            cache_hit_rates[name] = _hit_rate(hits - hits_before, misses - misses_before)
+        record = {
+            'recorded_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'app': self.app,
+            'fragment': self.fragment,
+            'total_ms': (time.perf_counter() - self._started) * 1000,
+            'sections': self.sections,
+            'fetches': self.calls,
+            'cache_hit_rates': cache_hit_rates,
+            'coalesced_requests': market_data.coalesced_requests(),
+            'cprofile': self.cprofile_path,
+        }
+        if self.trace_path:
+            with _trace_lock, open(self.trace_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+    def close(self):
+        """Stop timing and remove the fetch observer and cProfile (safe to call more than once)"""
+        # Sections that later rerun on their own (st.fragment) get a profiler of their own
+        self.enabled = False
+        self.closed = True
+        if self._observing is not None:
+            self._observing.__exit__(None, None, None)
+            self._observing = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if getattr(_active, 'profiler', None) is self:
+            _active.profiler = None
+
+    @contextlib.contextmanager
+    def fragment_rerun(self, fragment):
+        """The profiler a fragment times itself with: this one while its rerun is running,
+        otherwise (the fragment rerunning on its own) a fresh one, finished when the fragment returns"""
+        if not self.closed:
+            yield self
+            return
+        fragment_profiler = RerunProfiler(self.app, enabled=self.profile_reruns, trace_path=self.trace_path, fragment=fragment)
+        try:
+            yield fragment_profiler
+            fragment_profiler.finish()
+        finally:
+            fragment_profiler.close()
+
+    def _save_cprofile(self):
+        stream = io.StringIO()
+        stats = pstats.Stats(self._cprofile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PSTATS_LINES)
+        self.cprofile_text = stream.getvalue()
+        try:
+            os.makedirs(DEFAULT_PROFILE_DIR, exist_ok=True)
+            self.cprofile_path = os.path.join(DEFAULT_PROFILE_DIR, f"{self.app}-{datetime.datetime.now():%Y%m%d-%H%M%S}.prof")
+            stats.dump_stats(self.cprofile_path)
+        except OSError:
+            self.cprofile_path = None
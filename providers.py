@@ -0,0 +1,232 @@
+"""Market data providers behind market_data.
+
+market_data caches, coalesces and batches lookups; a provider only knows how to
+fetch them. Swapping the provider (market_data.set_provider) changes where every
+app, batch run and API request gets its data without touching any of them:
+
+- YFinanceProvider: live data from yfinance (the default)
+- SnapshotProvider: a directory recorded by snapshot.py, no network access
+- FakeProvider: in-memory data or a directory of CSV/JSON fixtures, for tests
+
+Set MARKET_DATA_SNAPSHOT or MARKET_DATA_FIXTURES to a directory to start the apps
+on one of the offline providers.
+"""
+import abc
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+
+def period_start(period, end):
+    """First date covered by a yfinance-style period ('30d', '6mo', '2y', 'max') ending at end"""
+    if period == 'max':
+        return None
+    for suffix, offset in [('mo', 'months'), ('y', 'years'), ('d', 'days')]:
+        if period.endswith(suffix):
+            return end - pd.DateOffset(**{offset: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _slice_period(history, period):
+    start = period_start(period, history.index.max()) if not history.empty else None
+    return history[history.index >= start] if start is not None else history
+
+
+class MarketDataProvider(abc.ABC):
+    """Interface every provider implements (a subclass missing a method cannot be instantiated); methods may raise on fetch errors"""
+
+    name = 'base'
+
+    @abc.abstractmethod
+    def spot_prices(self, tickers):
+        """Latest close of each ticker, as a dict of ticker -> price (None when unavailable)"""
+
+    @abc.abstractmethod
+    def expirations(self, ticker):
+        """Listed option expiry dates ('YYYY-MM-DD'), as a tuple"""
+
+    @abc.abstractmethod
+    def option_chain(self, ticker, expiry):
+        """Call chain for (ticker, expiry) with yfinance's columns"""
+
+    @abc.abstractmethod
+    def price_history(self, tickers, period):
+        """Daily closes over period, one column per ticker"""
+
+    @abc.abstractmethod
+    def dividends(self, ticker):
+        """Dividend per share paid on each ex-date, as a Series indexed by date"""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from yfinance, which keeps one HTTP session for the whole process"""
+
+    name = 'yfinance'
+
+    def __init__(self):
+        import yfinance
+        self._yf = yfinance
+
+    @staticmethod
+    def _close_from_history(history):
+        closes = history['Close'].dropna()
+        return float(closes.iloc[-1]) if not closes.empty else None
+
+    def _download_closes(self, tickers):
+        """Latest close for each ticker from one batched request; absent tickers are skipped"""
+        try:
+            history = self._yf.download(tickers, period="5d", group_by="ticker", progress=False, auto_adjust=False, threads=True)
+        except Exception:
+            return {}
+        closes = {}
+        for ticker in tickers:
+            try:
+                ticker_history = history[ticker] if isinstance(history.columns, pd.MultiIndex) else history
+                price = self._close_from_history(ticker_history)
+            except Exception:
+                price = None
+            if price is not None:
+                closes[ticker] = price
+        return closes
+
+    def _single_close(self, ticker):
+        try:
+            return self._close_from_history(self._yf.Ticker(ticker).history(period="5d"))
+        except Exception:
+            return None
+
+    def spot_prices(self, tickers):
+        # One batched request; a ticker missing from it is retried on its own
+        closes = self._download_closes(tickers)
+        return {ticker: closes[ticker] if closes.get(ticker) is not None else self._single_close(ticker) for ticker in tickers}
+
+    def expirations(self, ticker):
+        return tuple(self._yf.Ticker(ticker).options)
+
+    def option_chain(self, ticker, expiry):
+        return self._yf.Ticker(ticker).option_chain(expiry).calls
+
+    def price_history(self, tickers, period):
+        downloaded = self._yf.download(tickers, period=period, group_by="ticker", progress=False, auto_adjust=False, threads=True)
+        closes = {}
+        for ticker in tickers:
+            try:
+                ticker_history = downloaded[ticker] if isinstance(downloaded.columns, pd.MultiIndex) else downloaded
+                closes[ticker] = ticker_history['Close'].dropna()
+            except Exception:
+                closes[ticker] = pd.Series(dtype=float)
+        return pd.DataFrame(closes)
+
+    def dividends(self, ticker):
+        return self._yf.Ticker(ticker).dividends
+
+
+class SnapshotProvider(MarketDataProvider):
+    """Replays a snapshot directory written by snapshot.py"""
+
+    name = 'snapshot'
+
+    def __init__(self, path):
+        import snapshot
+        self.snapshot = snapshot.Snapshot(path)
+
+    def spot_prices(self, tickers):
+        return {ticker: self.snapshot.spot_price(ticker) for ticker in tickers}
+
+    def expirations(self, ticker):
+        return self.snapshot.expirations(ticker)
+
+    def option_chain(self, ticker, expiry):
+        return self.snapshot.option_chain(ticker, expiry)
+
+    def price_history(self, tickers, period):
+        return _slice_period(self.snapshot.price_history(tickers), period)
+
+    def dividends(self, ticker):
+        return self.snapshot.dividends(ticker)
+
+
+class FakeProvider(MarketDataProvider):
+    """Serves fixed data from memory and counts every call, for tests and offline demos.
+
+    spots maps ticker -> price, chains maps (ticker, expiry) -> call chain, history is a
+    DataFrame of daily closes (one column per ticker) and dividends maps ticker -> Series.
+    Expirations default to the expiries in chains. latency (seconds) is slept on every
+    call, to exercise coalescing and timeouts.
+    """
+
+    name = 'fake'
+
+    def __init__(self, spots=None, chains=None, history=None, dividends=None, expirations=None, latency=0.0):
+        self._spots = dict(spots or {})
+        self._chains = dict(chains or {})
+        self._history = history if history is not None else pd.DataFrame(dtype=float)
+        self._dividends = dict(dividends or {})
+        if expirations is None:
+            expirations = {}
+            for ticker, expiry in sorted(self._chains):
+                expirations.setdefault(ticker, []).append(expiry)
+        self._expirations = {ticker: tuple(expiries) for ticker, expiries in expirations.items()}
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, path, latency=0.0):
+        """Load fixtures: spots.json, chains/<TICKER>_<YYYY-MM-DD>.csv, history.csv and dividends.csv
+
+        history.csv has a date column then one column per ticker; dividends.csv has
+        date, ticker and dividend columns. Every file is optional.
+        """
+        spots = {}
+        if os.path.isfile(os.path.join(path, 'spots.json')):
+            with open(os.path.join(path, 'spots.json')) as f:
+                spots = {ticker: float(price) for ticker, price in json.load(f).items()}
+        chains = {}
+        for chain_path in glob.glob(os.path.join(path, 'chains', '*_*.csv')):
+            ticker, expiry = os.path.splitext(os.path.basename(chain_path))[0].rsplit('_', 1)
+            chains[(ticker, expiry)] = pd.read_csv(chain_path)
+        history = None
+        if os.path.isfile(os.path.join(path, 'history.csv')):
+            history = pd.read_csv(os.path.join(path, 'history.csv'), index_col='date', parse_dates=['date'])
+        dividends = {}
+        if os.path.isfile(os.path.join(path, 'dividends.csv')):
+            dividends_df = pd.read_csv(os.path.join(path, 'dividends.csv'), parse_dates=['date'])
+            dividends = {
+                ticker: group.set_index('date')['dividend']
+                for ticker, group in dividends_df.groupby('ticker')
+            }
+        return cls(spots, chains, history, dividends, latency=latency)
+
+    def _record(self, *key):
+        with self._lock:
+            self.calls[key] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def spot_prices(self, tickers):
+        self._record('spot_prices', tuple(tickers))
+        return {ticker: self._spots.get(ticker) for ticker in tickers}
+
+    def expirations(self, ticker):
+        self._record('expirations', ticker)
+        return self._expirations.get(ticker, ())
+
+    def option_chain(self, ticker, expiry):
+        self._record('option_chain', ticker, expiry)
+        if (ticker, expiry) not in self._chains:
+            raise KeyError(f"No fixture chain for {ticker} {expiry}")
+        return self._chains[(ticker, expiry)]
+
+    def price_history(self, tickers, period):
+        self._record('price_history', tuple(tickers), period)
+        return _slice_period(self._history.reindex(columns=list(tickers)).dropna(how='all'), period)
+
+    def dividends(self, ticker):
+        self._record('dividends', ticker)
+        return self._dividends.get(ticker, pd.Series(dtype=float))
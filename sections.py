@@ -0,0 +1,79 @@
+"""Fragment-scoped reruns for the options apps (portfolio.py, tlt_tmf.py).
+
+Below the holdings inputs, each section of the page is an st.fragment keyed by its
+name. A section publishes what later sections need with publish() and reads what
+earlier ones published with latest(), so it can rerun on its own and still see
+current upstream values.
+
+DEPENDENTS lists the sections downstream of each one, in page order. An input
+inside a section passes on_change=rerun_from(section): changing it reruns that
+section and its dependents only, reusing everything above them. Inputs with no
+dependents just rerun their own section; inputs above every section (quotes,
+holdings, the sidebar) still rerun the whole script.
+
+memo() keeps a section's expensive results for the session, keyed on their
+inputs, so a rerun whose inputs did not change reuses them.
+"""
+import hashlib
+import pickle
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+COMPARISON_CALLS = 'comparison_calls'
+SELL_CALLS = 'sell_calls'
+SAFE_SHORT_CALLS = 'safe_short_calls'
+STRATEGIES = 'strategies'
+PROJECTIONS = 'projections'
+
+# Sections that read each section's outputs, in page order
+DEPENDENTS = {
+    COMPARISON_CALLS: [SAFE_SHORT_CALLS, STRATEGIES, PROJECTIONS],
+    SELL_CALLS: [STRATEGIES, PROJECTIONS],
+    SAFE_SHORT_CALLS: [],
+    STRATEGIES: [PROJECTIONS],
+    PROJECTIONS: [],
+}
+
+_OUTPUTS_KEY = '_section_outputs'
+_MEMO_KEY = '_section_memo'
+
+
+def publish(section, outputs):
+    """Record a section's outputs (a dict) for the sections downstream of it"""
+    st.session_state.setdefault(_OUTPUTS_KEY, {})[section] = outputs
+
+
+def latest(section):
+    """The outputs section last published this session ({} if it has not run)"""
+    return st.session_state.get(_OUTPUTS_KEY, {}).get(section, {})
+
+
+def rerun_from(section):
+    """on_change callback rerunning section and every section downstream of it"""
+    def rerun():
+        try:
+            st.rerun([section] + DEPENDENTS[section])
+        except StreamlitAPIException:
+            # A downstream section has not rendered yet (e.g. the script stopped above it)
+            st.rerun()
+    return rerun
+
+
+def _fingerprint(inputs):
+    return hashlib.sha1(pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def memo(name, inputs, compute):
+    """compute(), or its result from the last call for name if inputs are unchanged.
+
+    Only the latest result per name is kept, so memory stays bounded per session.
+    """
+    cache = st.session_state.setdefault(_MEMO_KEY, {})
+    fingerprint = _fingerprint(inputs)
+    entry = cache.get(name)
+    if entry is not None and entry[0] == fingerprint:
+        return entry[1]
+    result = compute()
+    cache[name] = (fingerprint, result)
+    return result
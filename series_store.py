@@ -0,0 +1,182 @@
+"""SQLite time-series store behind swap.py.
+
+Each series is a table keyed by its date (ISO YYYY-MM-DD text, so the primary key
+index is also the date order) with one REAL column per value. The database runs in
+WAL mode, so charts reading in one session never block a submit writing in another.
+
+The logs written by spread_log.py stay the record: submits only append to them,
+and each table is a copy of its log. The imports table stores the (inode, mtime,
+size) of each log as last imported. A log that only grew since then (a submit, by
+any process) has just its new rows read, from the stored size on, and upserted; a
+log that was replaced or rewritten (a compaction, or an edit outside the app) is
+imported again in full. read_series() checks this first, so a chart always shows
+its log; a log that has not changed costs one os.stat() and no database access.
+read_series() can also be bounded to a date range, answered from the date index.
+The long 30Y histories live in history_store.py instead.
+
+Re-import everything by hand:
+
+    python series_store.py import
+"""
+import argparse
+import contextlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import spread_log
+
+DB_PATH = 'swap_store.db'
+
+SOFR = 'sofr_treasury_spread'
+YIELD_SPREADS = 'thirtyy_spread'
+
+# Table -> (source log, value columns)
+SERIES = {
+    SOFR: (spread_log.SOFR_LOG, spread_log.SOFR_COLUMNS[1:]),
+    YIELD_SPREADS: (spread_log.YIELD_LOG, spread_log.YIELD_COLUMNS[1:]),
+}
+
+# Seconds a writer waits for another writer's transaction before giving up
+BUSY_TIMEOUT = 10
+
+# sqlite3 connections belong to the thread that opened them (one per Streamlit session thread)
+_local = threading.local()
+
+# Table -> log (inode, mtime, size) this process last imported or found already imported
+_synced = {}
+
+# Database paths whose tables this process has created
+_schema_created = set()
+_schema_lock = threading.Lock()
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _create_schema(conn):
+    # WAL mode is stored in the database file, so it only needs setting once
+    conn.execute('PRAGMA journal_mode=WAL')
+    with _transaction(conn):
+        # Stores from before inodes were recorded: dropping their imports re-imports every log in full
+        if 'inode' not in {row[1] for row in conn.execute('PRAGMA table_info(imports)')}:
+            conn.execute('DROP TABLE IF EXISTS imports')
+        conn.execute('CREATE TABLE IF NOT EXISTS imports (series TEXT PRIMARY KEY, inode INTEGER, mtime REAL, size INTEGER)')
+        for table, (_, columns) in SERIES.items():
+            values = ''.join(f', {_quote(column)} REAL' for column in columns)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (date TEXT PRIMARY KEY{values}) WITHOUT ROWID')
+
+
+def connect():
+    """This thread's connection to DB_PATH, creating the tables once per process"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'path', None) != DB_PATH:
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with _schema_lock:
+            if DB_PATH not in _schema_created:
+                _create_schema(conn)
+                _schema_created.add(DB_PATH)
+        _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+
+@contextlib.contextmanager
+def _transaction(conn):
+    """A write transaction, taking the write lock up front so concurrent importers cannot interleave"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+# --- CSV import ---
+
+def _rows(table, df):
+    """Log rows (from spread_log) as (date, values...) tuples for table, missing values as None"""
+    columns = SERIES[table][1]
+    if 'Date' not in df:
+        return []
+    values = [pd.to_numeric(df[column], errors='coerce') if column in df else pd.Series(float('nan'), index=df.index)
+              for column in columns]
+    return list(zip(df['Date'].dt.strftime('%Y-%m-%d'), *(value.astype(object).where(value.notna(), None) for value in values)))
+
+
+def import_csv(table, force=False):
+    """Bring table up to date with its log; returns rows written.
+
+    Rows appended since the last import are upserted on their own; a log with another
+    inode, or no longer than at the last import, is imported again in full (as with force).
+    """
+    path, columns = SERIES[table]
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return 0
+    signature = (stat.st_ino, stat.st_mtime, stat.st_size)
+    if not force and _synced.get(table) == signature:
+        return 0
+    count = 0
+    conn = connect()
+    with _transaction(conn):
+        seen = conn.execute('SELECT inode, mtime, size FROM imports WHERE series = ?', (table,)).fetchone()
+        if force or seen != signature:
+            appended = not force and seen is not None and seen[0] == signature[0] and signature[2] > seen[2]
+            df, signature = spread_log.read_from(path, seen[2] if appended else 0)
+            rows = _rows(table, df)
+            if not appended:
+                conn.execute(f'DELETE FROM {table}')
+            conn.executemany(f'INSERT OR REPLACE INTO {table} VALUES ({", ".join("?" * (len(columns) + 1))})', rows)
+            conn.execute('INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)', (table, *signature))
+            count = len(rows)
+    _synced[table] = signature
+    return count
+
+
+def sync_csvs():
+    """Import every log that changed since its last import"""
+    for table in SERIES:
+        import_csv(table)
+
+
+# --- Reads ---
+
+
+def _frame(cursor):
+    df = pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+    df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d')
+    return df
+
+
+def read_series(table, columns=None, start=None, end=None):
+    """Date plus columns (default: all) of table from start to end (dates, inclusive; default: all), in date order.
+
+    The log is imported first if it changed.
+    """
+    import_csv(table)
+    columns = SERIES[table][1] if columns is None else columns
+    selected = ', '.join(['date AS Date'] + [_quote(column) for column in columns])
+    bounds = [(condition, pd.Timestamp(date).strftime('%Y-%m-%d')) for condition, date in [('date >= ?', start), ('date <= ?', end)] if date is not None]
+    where = ' WHERE ' + ' AND '.join(condition for condition, _ in bounds) if bounds else ''
+    return _frame(connect().execute(f'SELECT {selected} FROM {table}{where} ORDER BY date', [date for _, date in bounds]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the SQLite store behind swap.py")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('import', help="Re-import every series from its log")
+    subparsers.add_parser('sync', help="Import only rows logged since the last import")
+    args = parser.parse_args()
+    for table in SERIES:
+        count = import_csv(table, force=args.command == 'import')
+        print(f"{table}: {count} rows imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Offline market data snapshots for the TMF conversion apps.
+
+A snapshot is a directory of Parquet files holding everything the apps read from
+yfinance: spot prices, option expiry lists, call chains, daily price history and
+dividends.
+
+Record one (needs network access):
+
+    python snapshot.py record snapshots/2025-07-15 --tickers TMF TLT EDV --chains TLT EDV
+
+Replay it (no network access at all):
+
+    MARKET_DATA_SNAPSHOT=snapshots/2025-07-15 streamlit run portfolio.py
+"""
+import argparse
+import datetime
+import os
+
+import pandas as pd
+
+SPOTS_FILE = 'spots.parquet'
+EXPIRATIONS_FILE = 'expirations.parquet'
+CHAINS_FILE = 'chains.parquet'
+HISTORY_FILE = 'history.parquet'
+DIVIDENDS_FILE = 'dividends.parquet'
+
+DEFAULT_TICKERS = ['TMF', 'TLT', 'EDV']
+DEFAULT_CHAIN_TICKERS = ['TLT', 'EDV']
+DEFAULT_HISTORY_PERIOD = '5y'
+
+
+def write_snapshot(path, spots, expirations, chains, history=None, dividends=None):
+    """Write market data to a snapshot directory.
+
+    spots maps ticker -> price, expirations maps ticker -> expiry strings, chains
+    maps (ticker, expiry) -> call chain DataFrame, history is a DataFrame of
+    daily closes with one column per ticker and dividends maps ticker -> Series of
+    dividends indexed by ex-date.
+    """
+    os.makedirs(path, exist_ok=True)
+    recorded_at = pd.Timestamp(datetime.datetime.now(datetime.timezone.utc))
+
+    spots_df = pd.DataFrame({'ticker': list(spots), 'price': list(spots.values())})
+    spots_df['recorded_at'] = recorded_at
+    expirations_df = pd.DataFrame(
+        [(ticker, expiry) for ticker, expiries in expirations.items() for expiry in expiries],
+        columns=['ticker', 'expiry']
+    )
+    chain_frames = [calls.assign(ticker=ticker, expiry=expiry) for (ticker, expiry), calls in chains.items()]
+    chains_df = pd.concat(chain_frames, ignore_index=True) if chain_frames else pd.DataFrame(columns=['ticker', 'expiry'])
+    # Ticker and expiry repeat on every chain row; dictionary-encode them
+    for df in (expirations_df, chains_df):
+        df['ticker'] = df['ticker'].astype('category')
+        df['expiry'] = df['expiry'].astype('category')
+
+    spots_df.to_parquet(os.path.join(path, SPOTS_FILE), index=False, compression='zstd')
+    expirations_df.to_parquet(os.path.join(path, EXPIRATIONS_FILE), index=False, compression='zstd')
+    chains_df.to_parquet(os.path.join(path, CHAINS_FILE), index=False, compression='zstd')
+    if history is not None and not history.empty:
+        history_df = history.rename_axis('date').reset_index().melt(id_vars='date', var_name='ticker', value_name='close').dropna()
+        history_df['ticker'] = history_df['ticker'].astype('category')
+        history_df['close'] = history_df['close'].astype('float32')
+        history_df.to_parquet(os.path.join(path, HISTORY_FILE), index=False, compression='zstd')
+    dividend_frames = [
+        pd.DataFrame({'date': pd.to_datetime(series.index).tz_localize(None), 'ticker': ticker, 'dividend': series.to_numpy(dtype=float)})
+        for ticker, series in (dividends or {}).items()
+        if not series.empty
+    ]
+    if dividend_frames:
+        dividends_df = pd.concat(dividend_frames, ignore_index=True)
+        dividends_df['ticker'] = dividends_df['ticker'].astype('category')
+        dividends_df.to_parquet(os.path.join(path, DIVIDENDS_FILE), index=False, compression='zstd')
+
+
+def record_snapshot(path, tickers=DEFAULT_TICKERS, chain_tickers=DEFAULT_CHAIN_TICKERS, history_period=DEFAULT_HISTORY_PERIOD):
+    """Fetch spot prices, history and dividends for tickers and every call chain for chain_tickers, then write them to path"""
+    import market_data
+
+    spots = {ticker: price for ticker, price in market_data.get_spot_prices(tickers, max_age=0).items() if price is not None}
+    expirations = {ticker: market_data.get_expirations(ticker) for ticker in chain_tickers}
+    chains = {
+        (ticker, expiry): market_data.get_option_chain(ticker, expiry)
+        for ticker, expiries in expirations.items()
+        for expiry in expiries
+    }
+    history = market_data.get_price_history(tickers, period=history_period)
+    dividends = {ticker: market_data.get_dividends(ticker) for ticker in tickers}
+    write_snapshot(path, spots, expirations, chains, history, dividends)
+    return len(spots), len(chains)
+
+
+class Snapshot:
+    """Read-only view of a recorded snapshot directory, loaded fully into memory"""
+
+    def __init__(self, path):
+        self.path = path
+        spots_df = pd.read_parquet(os.path.join(path, SPOTS_FILE))
+        expirations_df = pd.read_parquet(os.path.join(path, EXPIRATIONS_FILE))
+        chains_df = pd.read_parquet(os.path.join(path, CHAINS_FILE))
+
+        self.recorded_at = spots_df['recorded_at'].max() if not spots_df.empty else None
+        self._spots = dict(zip(spots_df['ticker'], spots_df['price'].astype(float)))
+        self._expirations = {
+            ticker: tuple(group['expiry'].astype(str))
+            for ticker, group in expirations_df.groupby('ticker', observed=True, sort=False)
+        }
+        chain_columns = [col for col in chains_df.columns if col not in ('ticker', 'expiry')]
+        self._chains = {
+            (str(ticker), str(expiry)): group[chain_columns].reset_index(drop=True)
+            for (ticker, expiry), group in chains_df.groupby(['ticker', 'expiry'], observed=True, sort=False)
+        }
+        self._empty_chain = chains_df[chain_columns].iloc[:0]
+
+        history_path = os.path.join(path, HISTORY_FILE)
+        if os.path.isfile(history_path):
+            history_df = pd.read_parquet(history_path)
+            self._history = history_df.pivot(index='date', columns='ticker', values='close').astype(float)
+            self._history.columns = self._history.columns.astype(str)
+        else:
+            self._history = pd.DataFrame(dtype=float)
+
+        dividends_path = os.path.join(path, DIVIDENDS_FILE)
+        self._dividends = {}
+        if os.path.isfile(dividends_path):
+            dividends_df = pd.read_parquet(dividends_path)
+            self._dividends = {
+                str(ticker): group.set_index('date')['dividend']
+                for ticker, group in dividends_df.groupby('ticker', observed=True, sort=False)
+            }
+
+    def spot_price(self, ticker):
+        return self._spots.get(ticker)
+
+    def expirations(self, ticker):
+        return self._expirations.get(ticker, ())
+
+    def option_chain(self, ticker, expiry):
+        return self._chains.get((ticker, expiry), self._empty_chain)
+
+    def price_history(self, tickers):
+        return self._history.reindex(columns=list(tickers)).dropna(how='all')
+
+    def dividends(self, ticker):
+        return self._dividends.get(ticker, pd.Series(dtype=float))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record market data snapshots for offline replay")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="Fetch live market data and write a snapshot")
+    record_parser.add_argument('path', help="Snapshot directory to create")
+    record_parser.add_argument('--tickers', nargs='+', default=DEFAULT_TICKERS, help="Tickers to record spot prices for")
+    record_parser.add_argument('--chains', nargs='+', default=DEFAULT_CHAIN_TICKERS, help="Tickers to record every call chain for")
+    record_parser.add_argument('--history-period', default=DEFAULT_HISTORY_PERIOD, help="yfinance period of daily history to record")
+    args = parser.parse_args()
+
+    num_spots, num_chains = record_snapshot(args.path, args.tickers, args.chains, args.history_period)
+    print(f"Recorded {num_spots} spot prices and {num_chains} option chains to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
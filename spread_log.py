@@ -0,0 +1,203 @@
+"""Append-only writer for swap.py's daily spread logs.
+
+Submitting a day's values appends one CSV row instead of rewriting the whole log,
+so a submit costs the same however many years the log covers. Re-submitting a day
+appends a row that supersedes the earlier one: read_log() keeps the last row for
+each date, and after COMPACT_AFTER superseded rows the log is compacted
+(deduplicated, sorted, dates written as YYYY-MM-DD) into a temporary file that
+atomically replaces it.
+
+Writers in this process and in others are serialized by an exclusive lock on
+<log>.lock, which also holds the number of rows superseded since the last compaction.
+To tell a re-submitted date from a new one, each process keeps the set of dates in
+a log, read again only when another process has changed the log since.
+"""
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SOFR_LOG = 'sofr_treasury_spread_log.csv'
+SOFR_COLUMNS = ['Date', 'SOFR_Swap', 'Treasury_Yield', 'Spread']
+YIELD_LOG = 'thirtyy_spread_log.csv'
+YIELD_COLUMNS = [
+    'Date',
+    'US_30Y_Yield', 'US_Policy', 'US_Spread',
+    'Germany_30Y_Yield', 'Germany_Policy', 'Germany_Spread',
+    'Japan_30Y_Yield', 'Japan_Policy', 'Japan_Spread']
+
+# Superseded rows tolerated before the log is rewritten
+COMPACT_AFTER = 32
+
+# Bytes read from the end of a log to find its line terminator
+TAIL_BYTES = 4096
+
+# Sessions of one Streamlit process share it; the file lock covers other processes
+_thread_lock = threading.Lock()
+
+# Log path -> ((inode, size) of the log when read, dates it holds); only used under the lock
+_logged_dates = {}
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """Hold the exclusive lock for path, yielding the lock file (which stores the superseded row count)"""
+    with _thread_lock, open(path + '.lock', 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield lock_file
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _superseded(lock_file):
+    lock_file.seek(0)
+    text = lock_file.read().strip()
+    return int(text) if text.isdigit() else 0
+
+
+def _set_superseded(lock_file, count):
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(count))
+    lock_file.flush()
+
+
+def _tail(path):
+    """(line terminator, whether the file ends with one) of a log"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        tail = f.read().decode('utf-8-sig', errors='replace')
+    newline = '\r\n' if '\r\n' in tail else '\n'
+    return newline, tail.endswith(('\n', '\r'))
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size
+
+
+def _dates(path):
+    """Dates a log holds, read again only if it changed since this process last saw it"""
+    signature = _signature(path)
+    cached = _logged_dates.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    df = read_log(path)
+    dates = set(df['Date'].dt.date) if not df.empty else set()
+    _logged_dates[path] = (signature, dates)
+    return dates
+
+
+def _format_row(values, newline):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=newline).writerow(values)
+    return buffer.getvalue()
+
+
+def append_row(path, columns, row):
+    """Log row (a dict keyed by columns, with a datetime.date 'Date'), superseding any earlier row for that date.
+
+    O(1) once this process holds the log's dates; they are read again only after
+    another process wrote to the log.
+    """
+    values = [row['Date'].isoformat()] + [row[column] for column in columns[1:]]
+    with _locked(path) as lock_file:
+        exists = os.path.isfile(path) and os.path.getsize(path) > 0
+        newline, ends_with_newline = _tail(path) if exists else (os.linesep, True)
+        dates = _dates(path) if exists else set()
+        resubmitted = row['Date'] in dates
+        with open(path, 'a', newline='') as f:
+            if not exists:
+                f.write(_format_row(columns, newline))
+            elif not ends_with_newline:
+                f.write(newline)
+            f.write(_format_row(values, newline))
+            f.flush()
+            os.fsync(f.fileno())
+        dates.add(row['Date'])
+        if resubmitted:
+            superseded = _superseded(lock_file) + 1
+            if superseded >= COMPACT_AFTER:
+                _compact(path)
+                superseded = 0
+            _set_superseded(lock_file, superseded)
+        _logged_dates[path] = (_signature(path), dates)
+
+
+def read_log(path):
+    """A log as a DataFrame, one row per date (the last one logged), sorted by date.
+
+    Values are left as read; dates accept both the YYYY-MM-DD rows written here and
+    older M/D/YYYY ones. Rows with unparseable dates are dropped.
+    """
+    return _latest_per_date(pd.read_csv(path, dtype=str))
+
+
+def read_from(path, offset=0):
+    """Rows logged from byte offset on (as read_log() returns them) and the log's (inode, mtime, size).
+
+    offset is a size returned by an earlier call, so the rows appended since then can
+    be read without parsing the whole log. Reads take the write lock, so a row being
+    appended is never half read.
+    """
+    with _locked(path):
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            header = f.readline()
+            f.seek(max(offset, f.tell()))
+            rows = f.read(max(stat.st_size - f.tell(), 0))
+    df = _latest_per_date(pd.read_csv(io.BytesIO(header + rows), dtype=str)) if header.strip() else pd.DataFrame()
+    return df, (stat.st_ino, stat.st_mtime, stat.st_size)
+
+
+def _latest_per_date(df):
+    if df.empty:
+        return df
+    df['Date'] = pd.to_datetime(df['Date'], format='mixed', errors='coerce')
+    df = df.dropna(subset=['Date'])
+    df = df.drop_duplicates(subset=['Date'], keep='last')
+    return df.sort_values('Date', kind='mergesort').reset_index(drop=True)
+
+
+def _compact(path):
+    df = read_log(path)
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    newline, _ = _tail(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            df.to_csv(f, index=False, lineterminator=newline)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def compact(path):
+    """Rewrite a log with one row per date, sorted, replacing it atomically"""
+    with _locked(path) as lock_file:
+        if os.path.isfile(path):
+            _compact(path)
+        _set_superseded(lock_file, 0)
@@ -3,16 +3,20 @@ import datetime
 import streamlit as st
 import plotly.graph_objs as go
 import os
+import spread_log
+import series_store
+import history_store
+import moving_averages
 
 def get_latest_date_from_csvs():
     """Get the most recent date from existing CSV files"""
     latest_date = None
     
     # Check SOFR CSV
-    sofr_csv_file = 'sofr_treasury_spread_log.csv'
+    sofr_csv_file = spread_log.SOFR_LOG
     if os.path.isfile(sofr_csv_file):
         try:
-            df_sofr = pd.read_csv(sofr_csv_file, parse_dates=['Date'])
+            df_sofr = spread_log.read_log(sofr_csv_file)
             if not df_sofr.empty:
                 sofr_latest = df_sofr['Date'].max()
                 if latest_date is None or sofr_latest > latest_date:
@@ -21,10 +25,10 @@ def get_latest_date_from_csvs():
             pass
     
     # Check yield CSV
-    yield_csv_file = 'thirtyy_spread_log.csv'
+    yield_csv_file = spread_log.YIELD_LOG
     if os.path.isfile(yield_csv_file):
         try:
-            df_yield = pd.read_csv(yield_csv_file, parse_dates=['Date'])
+            df_yield = spread_log.read_log(yield_csv_file)
             if not df_yield.empty:
                 yield_latest = df_yield['Date'].max()
                 if latest_date is None or yield_latest > latest_date:
@@ -40,68 +44,26 @@ def get_latest_date_from_csvs():
     
     return latest_date.date()
 
+def log_sofr_row(today, sofr, treasury):
+    """Append today's SOFR/Treasury row to the log (replacing an earlier one for today)"""
+    row = {'Date': today, 'SOFR_Swap': f'{sofr:.4f}', 'Treasury_Yield': f'{treasury:.4f}', 'Spread': f'{sofr - treasury:.4f}'}
+    spread_log.append_row(spread_log.SOFR_LOG, spread_log.SOFR_COLUMNS, row)
+
+def log_yield_row(today, us_yield, germany_yield, japan_yield, fed_rate, ecb_rate, boj_rate):
+    """Append today's 30Y yield vs policy rate row to the log (replacing an earlier one for today)"""
+    row = {
+        'Date': today,
+        'US_30Y_Yield': f'{us_yield:.4f}', 'US_Policy': f'{fed_rate:.4f}', 'US_Spread': f'{us_yield - fed_rate:.4f}',
+        'Germany_30Y_Yield': f'{germany_yield:.4f}', 'Germany_Policy': f'{ecb_rate:.4f}', 'Germany_Spread': f'{germany_yield - ecb_rate:.4f}',
+        'Japan_30Y_Yield': f'{japan_yield:.4f}', 'Japan_Policy': f'{boj_rate:.4f}', 'Japan_Spread': f'{japan_yield - boj_rate:.4f}'
+    }
+    spread_log.append_row(spread_log.YIELD_LOG, spread_log.YIELD_COLUMNS, row)
+
 def update_csv_with_current_values(sofr, treasury, us_yield, germany_yield, japan_yield, fed_rate, ecb_rate, boj_rate):
-    """Update both CSV files with current values, removing duplicates"""
-    import datetime
+    """Log current values to both logs, replacing today's earlier rows"""
     today = datetime.date.today()  # Use today's date
-    
-    # Update SOFR/Treasury CSV
-    sofr_spread = sofr - treasury
-    sofr_csv_file = 'sofr_treasury_spread_log.csv'
-    
-    # Load existing SOFR data if present
-    if os.path.isfile(sofr_csv_file):
-        df_sofr = pd.read_csv(sofr_csv_file, parse_dates=['Date'])
-        # Remove any rows with today's date
-        df_sofr = df_sofr[df_sofr['Date'].dt.date != today]
-    else:
-        df_sofr = pd.DataFrame(columns=['Date', 'SOFR_Swap', 'Treasury_Yield', 'Spread'])
-    
-    # Append new SOFR row for today
-    new_sofr_row = pd.DataFrame([[pd.Timestamp(today), f'{sofr:.4f}', f'{treasury:.4f}', f'{sofr_spread:.4f}']], 
-                                columns=['Date', 'SOFR_Swap', 'Treasury_Yield', 'Spread'])
-    df_sofr = pd.concat([df_sofr, new_sofr_row], ignore_index=True)
-    # Remove duplicate dates, keep the last
-    df_sofr = df_sofr.drop_duplicates(subset=['Date'], keep='last')
-    # Sort by date
-    df_sofr = df_sofr.sort_values('Date')
-    # Write back to CSV
-    df_sofr.to_csv(sofr_csv_file, index=False)
-    
-    # Update Yield/Policy CSV
-    us_spread = us_yield - fed_rate
-    germany_spread = germany_yield - ecb_rate
-    japan_spread = japan_yield - boj_rate
-    yield_csv_file = 'thirtyy_spread_log.csv'
-    
-    # Load existing yield data if present
-    if os.path.isfile(yield_csv_file):
-        df_yield = pd.read_csv(yield_csv_file, parse_dates=['Date'])
-        # Remove any rows with today's date
-        df_yield = df_yield[df_yield['Date'].dt.date != today]
-    else:
-        df_yield = pd.DataFrame(columns=[
-            'Date',
-            'US_30Y_Yield', 'US_Policy', 'US_Spread',
-            'Germany_30Y_Yield', 'Germany_Policy', 'Germany_Spread',
-            'Japan_30Y_Yield', 'Japan_Policy', 'Japan_Spread'])
-    
-    # Append new yield row for today
-    new_yield_row = pd.DataFrame([[pd.Timestamp(today), f'{us_yield:.4f}', f'{fed_rate:.4f}', f'{us_spread:.4f}',
-                                   f'{germany_yield:.4f}', f'{ecb_rate:.4f}', f'{germany_spread:.4f}',
-                                   f'{japan_yield:.4f}', f'{boj_rate:.4f}', f'{japan_spread:.4f}']],
-                                 columns=[
-                                     'Date',
-                                     'US_30Y_Yield', 'US_Policy', 'US_Spread',
-                                     'Germany_30Y_Yield', 'Germany_Policy', 'Germany_Spread',
-                                     'Japan_30Y_Yield', 'Japan_Policy', 'Japan_Spread'])
-    df_yield = pd.concat([df_yield, new_yield_row], ignore_index=True)
-    # Remove duplicate dates, keep the last
-    df_yield = df_yield.drop_duplicates(subset=['Date'], keep='last')
-    # Sort by date
-    df_yield = df_yield.sort_values('Date')
-    # Write back to CSV
-    df_yield.to_csv(yield_csv_file, index=False)
+    log_sofr_row(today, sofr, treasury)
+    log_yield_row(today, us_yield, germany_yield, japan_yield, fed_rate, ecb_rate, boj_rate)
 
 def main():
     st.set_page_config(page_title="Bond Yield & Swap Analysis", layout="wide")
@@ -121,34 +83,8 @@ def main():
         if submit1 and (sofr is not None) and (treasury is not None):
             spread = sofr - treasury
             st.success(f"Spread (SOFR - Treasury): {spread:.2f}%")
-            # Update SOFR CSV only when user submits
-            today = datetime.date.today()
-            sofr_csv_file = 'sofr_treasury_spread_log.csv'
-            
-            # Load existing SOFR data if present
-            if os.path.isfile(sofr_csv_file):
-                df_sofr = pd.read_csv(sofr_csv_file)
-                if not df_sofr.empty:
-                    # Convert Date column to datetime, handling errors
-                    df_sofr['Date'] = pd.to_datetime(df_sofr['Date'], errors='coerce')
-                    # Remove rows with invalid dates
-                    df_sofr = df_sofr.dropna(subset=['Date'])
-                    if not df_sofr.empty:
-                        # Remove any rows with today's date
-                        df_sofr = df_sofr[df_sofr['Date'].dt.date != today]
-            else:
-                df_sofr = pd.DataFrame(columns=['Date', 'SOFR_Swap', 'Treasury_Yield', 'Spread'])
-            
-            # Append new SOFR row
-            new_sofr_row = pd.DataFrame([[pd.Timestamp(today), f'{sofr:.4f}', f'{treasury:.4f}', f'{spread:.4f}']], 
-                                        columns=['Date', 'SOFR_Swap', 'Treasury_Yield', 'Spread'])
-            df_sofr = pd.concat([df_sofr, new_sofr_row], ignore_index=True)
-            # Remove duplicate dates, keep the last
-            df_sofr = df_sofr.drop_duplicates(subset=['Date'], keep='last')
-            # Sort by date
-            df_sofr = df_sofr.sort_values('Date')
-            # Write back to CSV
-            df_sofr.to_csv(sofr_csv_file, index=False)
+            # Update SOFR CSV only when user submits (one appended row; a re-submit supersedes today's)
+            log_sofr_row(datetime.date.today(), sofr, treasury)
             st.info(f"Logged today's data to sofr_treasury_spread_log.csv")
     
     with col2:
@@ -164,44 +100,8 @@ def main():
             germany_spread = germany_yield - ecb_rate
             japan_spread = japan_yield - boj_rate
             st.success(f"US: {us_spread:.2f}% | Germany: {germany_spread:.2f}% | Japan: {japan_spread:.2f}%")
-            # Update yield CSV only when user submits
-            today = datetime.date.today()
-            yield_csv_file = 'thirtyy_spread_log.csv'
-            
-            # Load existing yield data if present
-            if os.path.isfile(yield_csv_file):
-                df_yield = pd.read_csv(yield_csv_file)
-                if not df_yield.empty:
-                    # Convert Date column to datetime, handling errors
-                    df_yield['Date'] = pd.to_datetime(df_yield['Date'], errors='coerce')
-                    # Remove rows with invalid dates
-                    df_yield = df_yield.dropna(subset=['Date'])
-                    if not df_yield.empty:
-                        # Remove any rows with today's date
-                        df_yield = df_yield[df_yield['Date'].dt.date != today]
-            else:
-                df_yield = pd.DataFrame(columns=[
-                    'Date',
-                    'US_30Y_Yield', 'US_Policy', 'US_Spread',
-                    'Germany_30Y_Yield', 'Germany_Policy', 'Germany_Spread',
-                    'Japan_30Y_Yield', 'Japan_Policy', 'Japan_Spread'])
-            
-            # Append new yield row
-            new_yield_row = pd.DataFrame([[pd.Timestamp(today), f'{treasury:.4f}', f'{fed_rate:.4f}', f'{us_spread:.4f}',
-                                           f'{germany_yield:.4f}', f'{ecb_rate:.4f}', f'{germany_spread:.4f}',
-                                           f'{japan_yield:.4f}', f'{boj_rate:.4f}', f'{japan_spread:.4f}']],
-                                         columns=[
-                                             'Date',
-                                             'US_30Y_Yield', 'US_Policy', 'US_Spread',
-                                             'Germany_30Y_Yield', 'Germany_Policy', 'Germany_Spread',
-                                             'Japan_30Y_Yield', 'Japan_Policy', 'Japan_Spread'])
-            df_yield = pd.concat([df_yield, new_yield_row], ignore_index=True)
-            # Remove duplicate dates, keep the last
-            df_yield = df_yield.drop_duplicates(subset=['Date'], keep='last')
-            # Sort by date
-            df_yield = df_yield.sort_values('Date')
-            # Write back to CSV
-            df_yield.to_csv(yield_csv_file, index=False)
+            # Update yield CSV only when user submits (one appended row; a re-submit supersedes today's)
+            log_yield_row(datetime.date.today(), treasury, germany_yield, japan_yield, fed_rate, ecb_rate, boj_rate)  # Use treasury value from left column
             st.info(f"Logged today's data to thirtyy_spread_log.csv")
     
     # Plots section - side by side
@@ -211,84 +111,63 @@ def main():
     with col_left:
         # --- Left side plot: 30Y Yield (left y-axis) and Swap Spread (right y-axis) ---
         st.markdown('**US 30Y SOFR Swap, Treasury Yield, and Spread**')
-        csv_file = 'sofr_treasury_spread_log.csv'
-        if os.path.isfile(csv_file):
-            df_log = pd.read_csv(csv_file, parse_dates=['Date'])
-            if not df_log.empty:
-                df_log['Date'] = pd.to_datetime(df_log['Date'])
-                df_log['SOFR_Swap'] = pd.to_numeric(df_log['SOFR_Swap'])
-                df_log['Treasury_Yield'] = pd.to_numeric(df_log['Treasury_Yield'])
-                df_log['Spread'] = pd.to_numeric(df_log['Spread'])
-
-                # Moving average options as horizontal checkboxes
-                st.markdown('**Show moving averages:**')
-                ma_periods = [7, 30, 60, 90]
-                ma_labels = [f'{p}-day MA' for p in ma_periods]
-                ma_selected = []
-                cols = st.columns(len(ma_periods))
-                for i, (col, label) in enumerate(zip(cols, ma_labels)):
-                    if col.checkbox(label, value=False, key=f'left_ma_{ma_periods[i]}'):
-                        ma_selected.append(ma_labels[i])
+        # One row per submitted date, oldest first
+        df_log = series_store.read_series(series_store.SOFR)
+        if not df_log.empty:
+            # Moving average options as horizontal checkboxes, plus an optional custom window
+            st.markdown('**Show moving averages:**')
+            custom_ma = st.number_input("Custom moving average (days, 0 for none)", min_value=0, max_value=3650, value=0, step=1, key="left_ma_custom")
+            ma_periods = moving_averages.windows(custom_ma)
+            ma_labels = [f'{p}-day MA' for p in ma_periods]
+            ma_selected = []
+            cols = st.columns(len(ma_periods))
+            for i, (col, label) in enumerate(zip(cols, ma_labels)):
+                if col.checkbox(label, value=False, key=f'left_ma_{ma_periods[i]}'):
+                    ma_selected.append(ma_labels[i])
 
-                # Compute moving averages if selected
-                for p in ma_periods:
-                    if f'{p}-day MA' in ma_selected:
-                        df_log[f'Yield_MA_{p}'] = df_log['Treasury_Yield'].rolling(window=p, min_periods=1).mean()
-                        df_log[f'Spread_MA_{p}'] = df_log['Spread'].rolling(window=p, min_periods=1).mean()
+            # All windows at once, in one cumulative-sum pass over the (short) log
+            moving_averages.add_moving_averages(df_log, {'Treasury_Yield': 'Yield', 'Spread': 'Spread'}, ma_periods)
 
-                # Plot with dual y-axes: 30Y Yield (left), Spread (right)
-                fig = go.Figure()
-                # Add raw series only if no moving average is selected
-                if not ma_selected:
-                    # 30Y Yield on left y-axis
-                    fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log['Treasury_Yield'], mode='lines', name='30Y Yield', line=dict(color='blue'), yaxis='y1'))
-                    # Spread on right y-axis
-                    fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log['Spread'], mode='lines', name='Swap Spread', line=dict(color='green'), yaxis='y2'))
-                # Add moving averages if selected
-                ma_colors = {7: 'royalblue', 30: 'orange', 60: 'purple', 90: 'brown'}
-                for p in ma_periods:
-                    if f'{p}-day MA' in ma_selected:
-                        fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log[f'Yield_MA_{p}'], mode='lines', name=f'30Y Yield {p}-day MA', line=dict(color=ma_colors[p], dash='dot'), yaxis='y1'))
-                        fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log[f'Spread_MA_{p}'], mode='lines', name=f'Swap Spread {p}-day MA', line=dict(color=ma_colors[p], dash='dash'), yaxis='y2'))
-                # Highlight zero line on right y-axis
-                fig.add_shape(type="line", x0=df_log['Date'].min(), x1=df_log['Date'].max(), y0=0, y1=0, line=dict(color="black", width=1, dash="dash"), xref='x', yref='y2')
-                fig.update_layout(
-                    title="US 30Y Yield and Swap Spread Over Time",
-                    xaxis=dict(title="Date"),
-                    yaxis=dict(title="30Y Yield", tickfont=dict(color='blue')),
-                    yaxis2=dict(title="Swap Spread", tickfont=dict(color='green'), overlaying='y', side='right', showgrid=False),
-                    legend_title="Series",
-                    hovermode="x unified",
-                    template="plotly_white",
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                st.write(f"**Data Summary:** {len(df_log)} points | {df_log['Date'].min().strftime('%Y-%m-%d')} to {df_log['Date'].max().strftime('%Y-%m-%d')}")
+            # Plot with dual y-axes: 30Y Yield (left), Spread (right)
+            fig = go.Figure()
+            # Add raw series only if no moving average is selected
+            if not ma_selected:
+                # 30Y Yield on left y-axis
+                fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log['Treasury_Yield'], mode='lines', name='30Y Yield', line=dict(color='blue'), yaxis='y1'))
+                # Spread on right y-axis
+                fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log['Spread'], mode='lines', name='Swap Spread', line=dict(color='green'), yaxis='y2'))
+            # Add moving averages if selected
+            ma_colors = {7: 'royalblue', 30: 'orange', 60: 'purple', 90: 'brown'}
+            for p in ma_periods:
+                if f'{p}-day MA' in ma_selected:
+                    fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log[f'Yield_MA_{p}'], mode='lines', name=f'30Y Yield {p}-day MA', line=dict(color=ma_colors.get(p, 'gray'), dash='dot'), yaxis='y1'))
+                    fig.add_trace(go.Scatter(x=df_log['Date'], y=df_log[f'Spread_MA_{p}'], mode='lines', name=f'Swap Spread {p}-day MA', line=dict(color=ma_colors.get(p, 'gray'), dash='dash'), yaxis='y2'))
+            # Highlight zero line on right y-axis
+            fig.add_shape(type="line", x0=df_log['Date'].min(), x1=df_log['Date'].max(), y0=0, y1=0, line=dict(color="black", width=1, dash="dash"), xref='x', yref='y2')
+            fig.update_layout(
+                title="US 30Y Yield and Swap Spread Over Time",
+                xaxis=dict(title="Date"),
+                yaxis=dict(title="30Y Yield", tickfont=dict(color='blue')),
+                yaxis2=dict(title="Swap Spread", tickfont=dict(color='green'), overlaying='y', side='right', showgrid=False),
+                legend_title="Series",
+                hovermode="x unified",
+                template="plotly_white",
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.write(f"**Data Summary:** {len(df_log)} points | {df_log['Date'].min().strftime('%Y-%m-%d')} to {df_log['Date'].max().strftime('%Y-%m-%d')}")
 
     with col_right:
         st.markdown("**30Y Yield minus Policy Rate Spread: US, Germany, Japan**")
         # Plot for right column
-        csv_file = 'thirtyy_spread_log.csv'
-        
-        # Load user-submitted data
-        user_data = None
-        if os.path.isfile(csv_file):
-            user_data = pd.read_csv(csv_file)
-            if not user_data.empty:
-                # Convert Date column to datetime, handling errors
-                user_data['Date'] = pd.to_datetime(user_data['Date'], errors='coerce')
-                # Remove rows with invalid dates
-                user_data = user_data.dropna(subset=['Date'])
-                if not user_data.empty:
-                    user_data['US_Spread'] = pd.to_numeric(user_data['US_Spread'], errors='coerce')
-                    user_data['Germany_Spread'] = pd.to_numeric(user_data['Germany_Spread'], errors='coerce')
-                    user_data['Japan_Spread'] = pd.to_numeric(user_data['Japan_Spread'], errors='coerce')
-                    # Remove rows with invalid numeric data
-                    user_data = user_data.dropna(subset=['US_Spread', 'Germany_Spread', 'Japan_Spread'])
+        # Load user-submitted data (one row per date, oldest first)
+        user_data = series_store.read_series(series_store.YIELD_SPREADS, ['US_Spread', 'Germany_Spread', 'Japan_Spread'])
+        # Remove rows with invalid numeric data
+        user_data = user_data.dropna(subset=['US_Spread', 'Germany_Spread', 'Japan_Spread'])
         
         # Use user data for plotting
-        if user_data is not None and not user_data.empty:
-            combined_data = user_data.sort_values('Date')
+        if not user_data.empty:
+            combined_data = user_data
             
             # Create plot
             fig = go.Figure()
@@ -334,22 +213,15 @@ def main():
 st.markdown('---')
 st.subheader('📈 Historical Data: 30Y Swap Spread & Yield')
 
-swap_csv = '30y_swap.csv'
-yield_csv = '30y.csv'
+swap_csv = history_store.SOURCES[history_store.SWAP]
+yield_csv = history_store.SOURCES[history_store.YIELD]
 
-if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
-    df_swap = pd.read_csv(swap_csv)
-    df_yield = pd.read_csv(yield_csv)
-    # Use capitalized column names
-    if 'Date' in df_swap.columns and 'Price' in df_swap.columns and 'Date' in df_yield.columns and 'Price' in df_yield.columns:
-        # Merge on Date
-        df_swap['Date'] = pd.to_datetime(df_swap['Date'])
-        df_yield['Date'] = pd.to_datetime(df_yield['Date'])
-        df_merged = pd.merge(df_swap[['Date', 'Price']], df_yield[['Date', 'Price']], on='Date', suffixes=('_swap', '_yield'))
-        df_merged['spread'] = df_merged['Price_swap'] - df_merged['Price_yield']
+# Re-partition replaced history CSVs (a no-op on most reruns)
+history_store.sync()
 
-        # Date range selector (show all options as radio buttons)
-        st.markdown('**Select time range to display:**')
+if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
+    # No partitions are written for a CSV that lacks the Date / Price columns
+    if history_store.has_history():
         range_options = {
             '7 Days': 7,
             '1 Month': 30,
@@ -361,18 +233,22 @@ if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
             '5 Years': 365*5,
             'All': None
         }
-        range_choice = st.radio('Time Range', list(range_options.keys()), index=len(range_options)-1, horizontal=True)
-        days = range_options[range_choice]
-        if days is not None:
-            max_date = df_merged['Date'].max()
-            min_date = max_date - pd.Timedelta(days=days)
-            df_plot = df_merged[df_merged['Date'] >= min_date]
+        # Switch ranges in the browser (the full history is sent once, no rerun per range)
+        # or on the server (only the year partitions in range are read and sent)
+        client_ranges = st.toggle('Switch ranges in the chart', value=True, key='client_ranges',
+                                  help="Sends the full history once; the range buttons on the chart then switch without a rerun")
+        if client_ranges:
+            days = None
         else:
-            df_plot = df_merged
+            # Date range selector (show all options as radio buttons)
+            st.markdown('**Select time range to display:**')
+            range_choice = st.radio('Time Range', list(range_options.keys()), index=len(range_options)-1, horizontal=True)
+            days = range_options[range_choice]
 
-        # Moving average options as horizontal checkboxes
+        # Moving average options as horizontal checkboxes, plus an optional custom window
         st.markdown('**Show moving averages:**')
-        ma_periods = [7, 30, 60, 90]
+        custom_ma = st.number_input("Custom moving average (days, 0 for none)", min_value=0, max_value=3650, value=0, step=1, key="ma_custom")
+        ma_periods = moving_averages.windows(custom_ma)
         ma_labels = [f'{p}-day MA' for p in ma_periods]
         ma_selected = []
         cols = st.columns(len(ma_periods))
@@ -380,11 +256,10 @@ if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
             if col.checkbox(label, value=False, key=f'ma_{ma_periods[i]}'):
                 ma_selected.append(ma_labels[i])
 
-        # Compute moving averages if selected
-        for p in ma_periods:
-            if f'{p}-day MA' in ma_selected:
-                df_plot[f'Yield_MA_{p}'] = df_plot['Price_yield'].rolling(window=p, min_periods=1).mean()
-                df_plot[f'Spread_MA_{p}'] = df_plot['spread'].rolling(window=p, min_periods=1).mean()
+        # Joined on Date, oldest first. Without moving averages only the year partitions in
+        # range are read; with them, every window comes precomputed over the full history
+        # (once per data version), so toggling one is free and its left edge is correct.
+        df_plot = history_store.read_history(days, ma_periods if ma_selected else ())
 
         # Plot with secondary y-axis for swap spread
         fig = go.Figure()
@@ -398,8 +273,8 @@ if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
         ma_colors = {7: 'royalblue', 30: 'orange', 60: 'purple', 90: 'brown'}
         for p in ma_periods:
             if f'{p}-day MA' in ma_selected:
-                fig.add_trace(go.Scatter(x=df_plot['Date'], y=df_plot[f'Yield_MA_{p}'], mode='lines', name=f'30Y Yield {p}-day MA', line=dict(color=ma_colors[p], dash='dot'), yaxis='y1'))
-                fig.add_trace(go.Scatter(x=df_plot['Date'], y=df_plot[f'Spread_MA_{p}'], mode='lines', name=f'Swap Spread {p}-day MA', line=dict(color=ma_colors[p], dash='dash'), yaxis='y2'))
+                fig.add_trace(go.Scatter(x=df_plot['Date'], y=df_plot[f'Yield_MA_{p}'], mode='lines', name=f'30Y Yield {p}-day MA', line=dict(color=ma_colors.get(p, 'gray'), dash='dot'), yaxis='y1'))
+                fig.add_trace(go.Scatter(x=df_plot['Date'], y=df_plot[f'Spread_MA_{p}'], mode='lines', name=f'Swap Spread {p}-day MA', line=dict(color=ma_colors.get(p, 'gray'), dash='dash'), yaxis='y2'))
         # Highlight zero line on right y-axis
         fig.add_shape(type="line", x0=df_plot['Date'].min(), x1=df_plot['Date'].max(), y0=0, y1=0, line=dict(color="black", width=1, dash="dash"), xref='x', yref='y2')
         fig.update_layout(
@@ -421,6 +296,18 @@ if os.path.isfile(swap_csv) and os.path.isfile(yield_csv):
             template="plotly_white",
             height=400
         )
+        if client_ranges:
+            # Same ranges as range_options, counted back in days from the latest date
+            fig.update_xaxes(
+                rangeslider_visible=False,
+                rangeselector=dict(
+                    buttons=[dict(count=d, label=label, step="day", stepmode="backward") if d is not None else dict(step="all", label=label)
+                             for label, d in range_options.items()],
+                    bgcolor='lightgray',
+                    activecolor='steelblue',
+                    font=dict(size=10)
+                )
+            )
         st.plotly_chart(fig, use_container_width=True)
         st.caption(f"Data points: {len(df_plot)} | {df_plot['Date'].min().strftime('%Y-%m-%d')} to {df_plot['Date'].max().strftime('%Y-%m-%d')}")
     else:
@@ -0,0 +1,36 @@
+import datetime
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import market_data  # noqa: E402
+import providers  # noqa: E402
+
+# At least 30 days out, so it is the default expiry
+EXPIRY = (datetime.date.today() + datetime.timedelta(days=60)).isoformat()
+
+
+@pytest.fixture
+def use_provider():
+    """Install a provider for one test, restoring the previous one (and empty caches) afterwards"""
+    previous = market_data.get_provider()
+    yield market_data.set_provider
+    market_data.set_provider(previous)
+
+
+@pytest.fixture
+def fake_provider():
+    """FakeProvider quoting TMF, TLT and EDV, with a nine-strike TLT and EDV chain on EXPIRY"""
+    spots = {'TMF': 40.0, 'TLT': 90.0, 'EDV': 70.0}
+    chains = {}
+    for etf in ['TLT', 'EDV']:
+        strikes = np.round(spots[etf] * np.linspace(0.8, 1.2, 9), 1)
+        chains[(etf, EXPIRY)] = pd.DataFrame({
+            'strike': strikes, 'bid': 1.0, 'ask': 1.1, 'impliedVolatility': 0.2, 'volume': 10, 'openInterest': 100
+        })
+    return providers.FakeProvider(spots=spots, chains=chains)
@@ -0,0 +1,57 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import api
+import batch
+
+
+@pytest.fixture
+def server(use_provider, fake_provider):
+    use_provider(fake_provider)
+    server = api.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, body, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        conn.putrequest('POST', '/convert')
+        for name, value in (headers or {'Content-Length': str(len(body))}).items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        conn.send(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_convert_against_a_fake_provider(server):
+    status, payload = _post(server, json.dumps({'account': 'A-1', 'tmf_shares': 1000}).encode())
+    assert status == 200
+    assert payload['spots'] == {'TMF': 40.0, 'TLT': 90.0, 'EDV': 70.0}
+    assert payload['missing_chains'] == []
+    assert set(batch.TABLES) <= set(payload)
+
+
+@pytest.mark.parametrize('body', [b'{"holdings": 5}', b'not json', b'{"dividend_yields": {"TLT": "high"}}'])
+def test_bad_bodies_are_client_errors(server, body):
+    status, payload = _post(server, body)
+    assert status == 400
+    assert payload['error']
+
+
+@pytest.mark.parametrize('length', ['-1', 'abc'])
+def test_invalid_content_length_is_rejected(server, length):
+    assert _post(server, b'{}', {'Content-Length': length})[0] == 400
+
+
+def test_oversized_body_is_rejected(server):
+    assert _post(server, b'', {'Content-Length': str(api.MAX_BODY_BYTES + 1)})[0] == 413
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import batch
+
+
+def test_partial_portfolio_is_merged_over_the_defaults(tmp_path, use_provider, fake_provider):
+    use_provider(fake_provider)
+    path = tmp_path / 'portfolios.json'
+    path.write_text(json.dumps([{
+        'account': 'A-1',
+        'dividend_yields': {'TLT': 4.2},
+        'strategies': {'TLT only': {'TLT': [50, 50]}},
+    }]))
+    [portfolio] = batch.load_portfolios(str(path))
+    assert portfolio['dividend_yields'] == {'TLT': 4.2, 'EDV': 4.9}
+    assert portfolio['strategies'] == {'TLT only': {'TLT': (50, 50), 'EDV': (0.0, 0.0)}}
+
+    tables = batch.evaluate_portfolio(portfolio, batch.fetch_market_data([portfolio]))
+    assert set(tables['sell_calls']['ETF']) <= {'TLT', 'EDV'}
+    assert not tables['sell_calls'].isna().any().any()
+
+
+def test_empty_csv_yield_keeps_the_default(tmp_path):
+    path = tmp_path / 'portfolios.csv'
+    path.write_text(
+        "account,strategy,tlt_shares_pct,tlt_calls_pct,edv_shares_pct,edv_calls_pct,tlt_yield,edv_yield\n"
+        "A-1,Strategy 1,0,50,50,0,,5.5\n"
+    )
+    [portfolio] = batch.load_portfolios(str(path))
+    assert portfolio['dividend_yields'] == {'TLT': 3.9, 'EDV': 5.5}
+
+
+def test_missing_allocation_is_rejected(tmp_path):
+    path = tmp_path / 'portfolios.csv'
+    path.write_text(
+        "account,strategy,tlt_shares_pct,tlt_calls_pct,edv_shares_pct,edv_calls_pct\n"
+        "A-1,Strategy 1,0,,50,0\n"
+    )
+    with pytest.raises(ValueError, match="Portfolio A-1: strategy Strategy 1 TLT must be a number"):
+        batch.load_portfolios(str(path))
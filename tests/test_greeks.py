@@ -0,0 +1,38 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import greeks
+import market_data
+import providers
+
+EXPIRY = (datetime.date.today() + datetime.timedelta(days=60)).isoformat()
+
+
+def _chain(strikes):
+    return pd.DataFrame({'strike': strikes, 'bid': 1.0, 'impliedVolatility': 0.2})
+
+
+def test_get_chain_greeks_follows_a_refetched_chain(use_provider):
+    provider = providers.FakeProvider(spots={'TLT': 90.0}, chains={('TLT', EXPIRY): _chain([80.0, 90.0, 100.0])})
+    use_provider(provider)
+    greeks.clear_greeks_cache()
+    first = greeks.get_chain_greeks('TLT', EXPIRY, 90.0)
+    assert len(first) == 3
+
+    # The chain cache entry expires and the next fetch lists different strikes
+    provider._chains[('TLT', EXPIRY)] = _chain([95.0, 105.0])
+    market_data.clear_option_cache()
+    refetched = greeks.get_chain_greeks('TLT', EXPIRY, 90.0)
+
+    expected = greeks.chain_greeks(_chain([95.0, 105.0]), 90.0, EXPIRY)
+    assert len(refetched) == 2
+    np.testing.assert_allclose(refetched['delta'], expected['delta'])
+    assert provider.calls[('option_chain', 'TLT', EXPIRY)] == 2
+
+
+def test_get_chain_greeks_reuses_greeks_of_the_same_chain(use_provider):
+    use_provider(providers.FakeProvider(chains={('TLT', EXPIRY): _chain([80.0, 90.0])}))
+    greeks.clear_greeks_cache()
+    assert greeks.get_chain_greeks('TLT', EXPIRY, 90.0) is greeks.get_chain_greeks('TLT', EXPIRY, 90.0)
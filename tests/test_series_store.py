@@ -0,0 +1,32 @@
+import datetime
+
+import series_store
+import spread_log
+
+
+def _log(day, sofr):
+    spread_log.append_row(spread_log.SOFR_LOG, spread_log.SOFR_COLUMNS, {
+        'Date': day, 'SOFR_Swap': f'{sofr:.4f}', 'Treasury_Yield': '4.0000', 'Spread': f'{sofr - 4:.4f}'
+    })
+
+
+def test_appended_rows_are_imported_on_their_own(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(series_store, 'DB_PATH', str(tmp_path / 'swap_store.db'))
+    monkeypatch.setattr(series_store, '_synced', {})
+    day = datetime.date(2025, 1, 1)
+    for i in range(3):
+        _log(day + datetime.timedelta(days=i), 4.5)
+    assert series_store.import_csv(series_store.SOFR) == 3
+
+    _log(day + datetime.timedelta(days=3), 4.6)
+    _log(day, 4.7)  # supersedes the first day's row
+    assert series_store.import_csv(series_store.SOFR) == 2
+    df = series_store.read_series(series_store.SOFR)
+    assert len(df) == 4
+    assert df['SOFR_Swap'].tolist() == [4.7, 4.5, 4.5, 4.6]
+
+    # Compaction rewrites the log, which is then imported in full
+    spread_log.compact(spread_log.SOFR_LOG)
+    assert series_store.import_csv(series_store.SOFR) == 4
+    assert series_store.read_series(series_store.SOFR, start=day + datetime.timedelta(days=2))['SOFR_Swap'].tolist() == [4.5, 4.6]
@@ -0,0 +1,40 @@
+import datetime
+
+import spread_log
+
+
+def _log(path, day, sofr):
+    spread_log.append_row(path, spread_log.SOFR_COLUMNS, {
+        'Date': day, 'SOFR_Swap': f'{sofr:.4f}', 'Treasury_Yield': '4.0000', 'Spread': f'{sofr - 4:.4f}'
+    })
+
+
+def _lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_resubmitting_an_earlier_date_counts_towards_compaction(tmp_path):
+    path = str(tmp_path / 'log.csv')
+    first, last = datetime.date(2025, 1, 1), datetime.date(2025, 1, 2)
+    _log(path, first, 4.5)
+    _log(path, last, 4.5)
+    for i in range(spread_log.COMPACT_AFTER - 1):
+        _log(path, first, 4.6 + i / 100)
+    assert len(_lines(path)) == 2 + spread_log.COMPACT_AFTER
+
+    _log(path, first, 5.0)
+    assert len(_lines(path)) == 3
+    df = spread_log.read_log(path)
+    assert df['SOFR_Swap'].tolist() == ['5.0000', '4.5000']
+
+
+def test_dates_written_by_another_writer_are_seen(tmp_path):
+    path = str(tmp_path / 'log.csv')
+    day = datetime.date(2025, 1, 1)
+    _log(path, day, 4.5)
+    with open(path, 'a') as f:  # another process appending its own row
+        f.write('2025-01-02,4.5000,4.0000,0.5000\n')
+    _log(path, datetime.date(2025, 1, 2), 4.7)
+    with open(path + '.lock') as f:
+        assert f.read() == '1'
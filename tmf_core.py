@@ -0,0 +1,374 @@
+"""Numeric core of the TMF conversion apps (portfolio.py, tlt_tmf.py).
+
+Everything here works on plain floats and numeric DataFrames. Dollar and percent
+strings are produced only by format_table(), right before a table is shown.
+Nothing here imports Streamlit or fetches market data, so the same functions back
+the apps and any script that imports this module.
+"""
+import numpy as np
+import pandas as pd
+
+STRATEGY_ETFS = ['TLT', 'EDV']
+
+# Capital controlled in each ETF is scaled by this to express it in TLT terms
+TLT_EQUIVALENT_MULTIPLES = {'TLT': 1.0, 'EDV': 1.3}
+
+# "Current TLT" in the combined summary is this multiple of the capital used
+CURRENT_TLT_MULTIPLE = 2.2
+
+# Times a year a sold call is rolled when its DTE is unknown (monthly)
+DEFAULT_ROLLS_PER_YEAR = 12
+
+MONEY_FORMAT = "${:,.0f}"
+PRICE_FORMAT = "${:,.2f}"
+PERCENT_FORMAT = "{:.2f}%"
+WHOLE_PERCENT_FORMAT = "{:.0f}%"
+
+
+def linked_offset(offset, multiple, lower, upper):
+    """A percent offset that follows another one: offset x multiple, clamped to [lower, upper]"""
+    return max(lower, min(upper, offset * multiple))
+
+
+def compute_exposures(tmf_shares, tmf_price, tickers, values, prices, multiples):
+    """Per-holding rows: shares held, current exposure and the exposure still needed.
+
+    The target exposure of each holding is the TMF position's value times its multiple.
+    """
+    tmf_exposure = tmf_shares * tmf_price
+    rows = []
+    for ticker, value, price, multiple in zip(tickers, values, prices, multiples):
+        shares = int(round(value / price)) if price > 0 else 0
+        exposure = shares * price
+        target_exposure = tmf_exposure * multiple
+        rows.append({
+            'ETF': ticker,
+            'Shares': shares,
+            'Current Value': value,
+            'Current Exposure': exposure,
+            'Net Exposure Needed': target_exposure - exposure,
+            'Multiple': multiple,
+            'Price': price,
+            'Target Exposure': target_exposure
+        })
+    return rows
+
+
+def size_contracts(net_needed_exposure, price, delta, bid):
+    """(per-contract exposure, contracts needed, total premium cost) to cover an exposure with one call.
+
+    Contracts needed is fractional; delta and bid are None when no call is selected.
+    """
+    contract_exposure = delta * 100 * price if delta is not None else 0
+    contracts_needed = net_needed_exposure / contract_exposure if contract_exposure else 0
+    total_premium_cost = contracts_needed * bid * 100 if bid is not None else 0
+    return contract_exposure, contracts_needed, total_premium_cost
+
+
+def combine_exposures(exposure_df, comparison_df):
+    """Final combined table: holdings joined with their call sizing, whole contracts and total exposure"""
+    merged_df = pd.merge(exposure_df, comparison_df, on='ETF', how='inner')
+    merged_df = merged_df.drop(columns=[col for col in ['Multiple', 'Price', 'Target Exposure'] if col in merged_df.columns])
+    merged_df['Total Exposure'] = merged_df['Current Exposure'] + merged_df['Total Premium Cost']
+
+    # 'Current Exposure' goes just before 'Total Premium Cost'
+    cols = [col for col in merged_df.columns if col != 'Current Exposure']
+    cols.insert(cols.index('Total Premium Cost'), 'Current Exposure')
+    merged_df = merged_df[cols]
+    merged_df['Contracts Needed'] = np.ceil(merged_df['Contracts Needed']).astype(int)
+    return merged_df
+
+
+def closest_call(calls, spot, offset_pct):
+    """Row of a call chain whose strike is nearest spot moved by offset_pct percent"""
+    target_strike = spot * (1 + offset_pct / 100)
+    return calls.loc[(calls['strike'] - target_strike).abs().idxmin()]
+
+
+def safe_short_calls(calls, long_strike, long_premium):
+    """Calls of one chain that keep a long call safe, by rising margin.
+
+    A short call is safe when the break-even (long strike + premium paid - premium
+    received) is positive and below its strike; see scan_short_calls for every expiry.
+    """
+    calls = calls.assign(safe_price=long_strike + long_premium - calls['bid'])
+    calls['margin'] = calls['strike'] - calls['safe_price']
+    safe_calls = calls[(calls['safe_price'] > 0) & (calls['margin'] > 0)]
+    return safe_calls.sort_values('margin', ascending=True)
+
+
+def allocate_strategy(strategy, total_capital, allocations, prices, contract_costs):
+    """Per-ETF rows for one strategy.
+
+    allocations maps ETF -> (shares %, calls %) of total_capital, prices maps ETF -> spot
+    price and contract_costs maps ETF -> cost of one call contract (0 when none is selected).
+    """
+    rows = []
+    for etf in STRATEGY_ETFS:
+        price = prices.get(etf, 0.0)
+        shares_pct, calls_pct = allocations[etf]
+        capital_for_shares = total_capital * (shares_pct / 100)
+        capital_for_calls = total_capital * (calls_pct / 100)
+
+        shares_bought = int(capital_for_shares // price) if price > 0 else 0
+        contract_cost = contract_costs.get(etf, 0.0)
+        contracts_bought = int(capital_for_calls // contract_cost) if contract_cost > 0 else 0
+        contracts_on_shares = shares_bought // 100
+        total_contracts = contracts_bought + contracts_on_shares
+        total_capital_controlled = total_contracts * 100 * price
+
+        rows.append({
+            'Strategy': strategy,
+            'ETF': etf,
+            'Shares Allocation (%)': shares_pct,
+            'Calls Allocation (%)': calls_pct,
+            'Capital for Shares': capital_for_shares,
+            'Shares Bought': shares_bought,
+            'Capital for Calls': capital_for_calls,
+            'Contracts Bought': contracts_bought,
+            'Contracts on Shares': contracts_on_shares,
+            'Total Contracts': total_contracts,
+            'Total Capital Controlled': total_capital_controlled,
+            'TLT Equivalent Capital': total_capital_controlled * TLT_EQUIVALENT_MULTIPLES.get(etf, 1.0)
+        })
+    return rows
+
+
+def summarize_strategies(strategies_df):
+    """One row per strategy with the totals of its per-ETF rows"""
+    grouped = strategies_df.assign(
+        capital_used=strategies_df['Capital for Shares'] + strategies_df['Capital for Calls']
+    ).groupby('Strategy', sort=False)
+    return pd.DataFrame({
+        'Total Contracts': grouped['Total Contracts'].sum(),
+        'Total Shares': grouped['Shares Bought'].sum(),
+        'Total Capital Used': grouped['capital_used'].sum(),
+        'Total Capital Controlled': grouped['Total Capital Controlled'].sum(),
+        'Total TLT Equivalent Capital': grouped['TLT Equivalent Capital'].sum()
+    }).reset_index()
+
+
+def rolls_per_year(dte):
+    """How many times a year a call with dte days to expiry can be sold back to back"""
+    return 365.0 / max(dte, 1)
+
+
+def sell_call_income(strategies_df, strategy_summary_df, sold_calls, prices, dividend_yields, rolls=None):
+    """Premium and dividend income from selling one call per contract held.
+
+    sold_calls maps ETF -> (strike, bid) of the call being sold; ETFs without one are
+    left out. dividend_yields are in percent. rolls maps ETF -> times a year the call
+    is re-sold (see rolls_per_year); ETFs missing from it roll monthly.
+    """
+    rolls = rolls or {}
+    # Plain lookups instead of merges: this runs once per portfolio in batch mode
+    rows = strategies_df[strategies_df['ETF'].isin(list(sold_calls))]
+    etfs = rows['ETF'].tolist()
+    contracts = rows['Total Contracts'].to_numpy()
+    bids = np.array([sold_calls[etf][1] for etf in etfs], dtype=float)
+    capital_by_strategy = dict(zip(strategy_summary_df['Strategy'], strategy_summary_df['Total Capital Used']))
+    capital_used = np.array([capital_by_strategy[strategy] for strategy in rows['Strategy']], dtype=float)
+
+    premium_collected = contracts * bids * 100
+    annual_premium = premium_collected * np.array([rolls.get(etf, DEFAULT_ROLLS_PER_YEAR) for etf in etfs], dtype=float)
+    annual_dividends = rows['Shares Bought'].to_numpy() * np.array(
+        [prices[etf] * dividend_yields[etf] for etf in etfs], dtype=float
+    ) / 100.0
+    total_income = annual_dividends + annual_premium
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_return = np.where(capital_used > 0, total_income / capital_used * 100, 0.0)
+    return pd.DataFrame({
+        'Strategy': rows['Strategy'].to_numpy(),
+        'ETF': etfs,
+        'Strike Price': np.array([sold_calls[etf][0] for etf in etfs], dtype=float),
+        'Bid Premium': bids,
+        'Contracts Sold': contracts,
+        'Total Premium Collected': premium_collected,
+        'Annual Premium': annual_premium,
+        'Annual Dividend Income': annual_dividends,
+        'Total Annual Income': total_income,
+        'Monthly Total Income': total_income / 12,
+        'Annual Return (%)': annual_return
+    })
+
+
+def summarize_sell_calls(sell_df, strategy_summary_df):
+    """Combined sell-call income and return for each strategy that sells calls"""
+    income = sell_df.groupby('Strategy', sort=False)['Total Annual Income'].sum()
+    df = strategy_summary_df[strategy_summary_df['Strategy'].isin(income.index)]
+    capital_used = df['Total Capital Used'].to_numpy(dtype=float)
+    total_income = df['Strategy'].map(income).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual_return = np.where(capital_used > 0, total_income / capital_used * 100, 0.0)
+    return pd.DataFrame({
+        'Strategy': df['Strategy'].to_numpy(),
+        'Annual Return (%)': annual_return,
+        'Total Capital Used': capital_used,
+        'Total Annual Income': total_income,
+        'Monthly Income': total_income / 12
+    })
+
+
+def combine_summaries(strategy_summary_df, sell_summary_df):
+    """Strategy totals joined with their sell-call income (zero when no calls are sold)"""
+    sell_by_strategy = sell_summary_df.set_index('Strategy')
+    df = strategy_summary_df.copy()
+    for col in ['Annual Return (%)', 'Total Annual Income', 'Monthly Income']:
+        df[col] = df['Strategy'].map(sell_by_strategy[col]).fillna(0.0).astype(float)
+    df['Current TLT'] = df['Total Capital Used'] * CURRENT_TLT_MULTIPLE
+    return df
+
+
+def projected_returns(combined_df, upside_pct, months):
+    """Projected dollar return on TLT-equivalent capital and its annualized % of capital used"""
+    capital_used = combined_df['Total Capital Used']
+    projected_return = combined_df['Total TLT Equivalent Capital'] * (upside_pct / 100)
+    if months > 0:
+        period_return = projected_return / capital_used.where(capital_used > 0)
+        annualized_pct = ((1 + period_return) ** (12 / months) - 1) * 100
+    else:
+        annualized_pct = pd.Series(np.nan, index=combined_df.index)
+    return combined_df.assign(**{
+        'Projected Return ($)': projected_return,
+        'Annualized Return (%)': annualized_pct.fillna(0.0)
+    })
+
+
+def evaluate_strategies(total_capital, strategies, prices, contract_costs, sold_calls, dividend_yields,
+                        rolls=None, upside_pct=0.0, months=12):
+    """Every strategy table for a set of strategies, from numeric inputs only.
+
+    strategies maps strategy name -> allocations (see allocate_strategy). Returns a dict
+    with the 'strategies', 'summary', 'sell_calls', 'sell_summary', 'combined' and
+    'projected' DataFrames, exactly as the apps build them.
+    """
+    rows = []
+    for name, allocations in strategies.items():
+        rows.extend(allocate_strategy(name, total_capital, allocations, prices, contract_costs))
+    strategies_df = pd.DataFrame(rows)
+    summary_df = summarize_strategies(strategies_df)
+    sell_df = sell_call_income(strategies_df, summary_df, sold_calls, prices, dividend_yields, rolls=rolls)
+    sell_summary_df = summarize_sell_calls(sell_df, summary_df)
+    combined_df = combine_summaries(summary_df, sell_summary_df)
+    return {
+        'strategies': strategies_df,
+        'summary': summary_df,
+        'sell_calls': sell_df,
+        'sell_summary': sell_summary_df,
+        'combined': combined_df,
+        'projected': projected_returns(combined_df, upside_pct, months)
+    }
+
+
+def allocation_grid(step_pct=5.0):
+    """Every (TLT shares %, TLT calls %, EDV shares %, EDV calls %) split on a step_pct grid.
+
+    Only splits that allocate at most 100% are kept. Returns an (n, 4) float array.
+    """
+    units = int(round(100 / step_pct))
+    levels = np.arange(units + 1, dtype=np.int16)
+    a, b, c = np.meshgrid(levels, levels, levels, indexing='ij')
+    a, b, c = a.ravel(), b.ravel(), c.ravel()
+    keep = a + b + c <= units
+    a, b, c = a[keep], b[keep], c[keep]
+    # Expand each (a, b, c) with every d that still fits in the remaining units
+    repeats = units - (a + b + c) + 1
+    starts = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    d = np.arange(repeats.sum()) - starts
+    grid = np.column_stack([np.repeat(a, repeats), np.repeat(b, repeats), np.repeat(c, repeats), d])
+    return grid * (100.0 / units)
+
+
+def evaluate_allocations(grid, total_capital, prices, contract_costs, sell_bids, dividend_yields, rolls=None):
+    """Vectorized allocate_strategy + sell_call_income over every row of an allocation grid.
+
+    grid columns follow allocation_grid(); sell_bids maps ETF -> bid of the call sold
+    against each contract held (missing ETFs sell nothing). Returns one row per split.
+    """
+    rolls = rolls or {}
+    result = {
+        'TLT Shares (%)': grid[:, 0],
+        'TLT Calls (%)': grid[:, 1],
+        'EDV Shares (%)': grid[:, 2],
+        'EDV Calls (%)': grid[:, 3],
+    }
+    total_contracts = np.zeros(len(grid))
+    total_shares = np.zeros(len(grid))
+    capital_controlled = np.zeros(len(grid))
+    tlt_equivalent = np.zeros(len(grid))
+    annual_income = np.zeros(len(grid))
+    for i, etf in enumerate(STRATEGY_ETFS):
+        price = prices.get(etf, 0.0)
+        contract_cost = contract_costs.get(etf, 0.0)
+        shares = np.floor(total_capital * grid[:, 2 * i] / 100 / price) if price > 0 else np.zeros(len(grid))
+        contracts_bought = np.floor(total_capital * grid[:, 2 * i + 1] / 100 / contract_cost) if contract_cost > 0 else np.zeros(len(grid))
+        contracts = contracts_bought + np.floor(shares / 100)
+        controlled = contracts * 100 * price
+
+        total_contracts += contracts
+        total_shares += shares
+        capital_controlled += controlled
+        tlt_equivalent += controlled * TLT_EQUIVALENT_MULTIPLES.get(etf, 1.0)
+        annual_income += contracts * sell_bids.get(etf, 0.0) * 100 * rolls.get(etf, DEFAULT_ROLLS_PER_YEAR)
+        annual_income += shares * price * dividend_yields.get(etf, 0.0) / 100.0
+
+    capital_used = total_capital * grid.sum(axis=1) / 100
+    result.update({
+        'Total Contracts': total_contracts.astype(int),
+        'Total Shares': total_shares.astype(int),
+        'Total Capital Used': capital_used,
+        'Total Capital Controlled': capital_controlled,
+        'Total TLT Equivalent Capital': tlt_equivalent,
+        'Total Annual Income': annual_income,
+        'Annual Return (%)': np.divide(annual_income * 100, capital_used, out=np.zeros(len(grid)), where=capital_used > 0)
+    })
+    return pd.DataFrame(result)
+
+
+def pareto_frontier(df, exposure='Total TLT Equivalent Capital', income='Total Annual Income'):
+    """Rows of df not beaten on both exposure and income by any other row, by rising exposure"""
+    ordered = df.sort_values([exposure, income], ascending=False, kind='mergesort')
+    best_income_so_far = ordered[income].cummax().shift(fill_value=-np.inf)
+    return ordered[ordered[income] > best_income_so_far].iloc[::-1].reset_index(drop=True)
+
+
+def scan_short_calls(chains, positions, today=None):
+    """Rank every expiry x strike short call that keeps a long call position safe.
+
+    chains maps (ETF, expiry) -> call chain and positions maps ETF -> (long strike,
+    long premium paid, spot). A short call is safe when the position's break-even
+    (long strike + premium paid - premium received) is positive and below the short
+    strike. Premium yield is bid / spot, annualized with the contract's real DTE.
+    """
+    frames = [
+        calls[['strike', 'bid', 'ask']].assign(ETF=etf, expiry=expiry)
+        for (etf, expiry), calls in chains.items()
+        if etf in positions and not calls.empty
+    ]
+    columns = ['ETF', 'expiry', 'dte', 'strike', 'bid', 'ask', 'safe_price', 'margin', 'premium_yield_pct', 'annualized_yield_pct']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True)
+
+    today = pd.Timestamp(today or pd.Timestamp.today().date())
+    df['dte'] = (pd.to_datetime(df['expiry'], format="%Y-%m-%d") - today).dt.days.clip(lower=1)
+    long_strike = df['ETF'].map({etf: position[0] for etf, position in positions.items()})
+    long_premium = df['ETF'].map({etf: position[1] for etf, position in positions.items()})
+    spot = df['ETF'].map({etf: position[2] for etf, position in positions.items()})
+
+    df['safe_price'] = long_strike + long_premium - df['bid']
+    df['margin'] = df['strike'] - df['safe_price']
+    df['premium_yield_pct'] = df['bid'] / spot.where(spot > 0) * 100
+    df['annualized_yield_pct'] = df['premium_yield_pct'] * 365.0 / df['dte']
+    safe = df[(df['safe_price'] > 0) & (df['margin'] > 0) & (df['bid'] > 0)]
+    return safe.sort_values('annualized_yield_pct', ascending=False, kind='mergesort')[columns].reset_index(drop=True)
+
+
+def format_table(df, money=(), price=(), percent=(), whole_percent=()):
+    """Display copy of df with the given numeric columns rendered as dollar/percent strings"""
+    out = df.copy()
+    for columns, fmt in [(money, MONEY_FORMAT), (price, PRICE_FORMAT), (percent, PERCENT_FORMAT), (whole_percent, WHOLE_PERCENT_FORMAT)]:
+        for col in columns:
+            if col in out.columns:
+                out[col] = out[col].map(fmt.format)
+    return out
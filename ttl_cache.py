@@ -0,0 +1,57 @@
+"""Thread-safe TTL/LRU cache shared by the market data layer and the local stores.
+
+Standard library only, so modules that just need a cache (history_store.py) do not
+pull in market_data.py and its providers.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries go stale after ``ttl`` seconds.
+
+    At most ``maxsize`` entries are kept; the least recently used one is evicted
+    first. Hits and misses are counted so the apps can show how well it works.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl, maxsize=128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, max_age=None):
+        """Return the cached value, or None if absent or older than max_age (defaults to ttl)"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING or time.monotonic() - entry[0] > max_age:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)